@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# attribute access micro benchmark: direct keys, plain aliases, dotted
+# aliases and magic (prefix) aliases, read and write.
+
+import timeit
+
+Setup = """
+from scad import Cube, Cylinder, Pipe
+cube = Cube((1, 2, 3))
+cyl = Cylinder(r=1, h=2)
+pipe = Pipe(or1=8, ir1=7, h=20.0)
+"""
+
+Cases = [
+    ("direct read", "cyl.height"),
+    ("alias read", "cyl.h"),
+    ("dotted alias read", "cube.x"),
+    ("magic alias read", "pipe.ir1"),
+    ("direct write", "cyl.height = 2.0"),
+    ("alias write", "cyl.h = 2.0"),
+    ("dotted alias write", "cube.x = 2.0"),
+    ("magic alias write", "pipe.ir1 = 6.0"),
+    ("construct", "Cylinder(r=1, h=2)"),
+    ("batched update", "pipe.update({'center': True, 'debug': True, 'disable': False})"),
+]
+
+def run(number=20000, repeat=3):
+    results = []
+    for (label, stmt) in Cases:
+        best = min(timeit.repeat(stmt, Setup, number=number, repeat=repeat))
+        results.append((label, best / number * 1e6))
+    return results
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.CRITICAL)
+    for (label, usec) in run():
+        print "%-20s %8.2f usec" % (label, usec)
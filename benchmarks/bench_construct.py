@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# construction cost of primitives and composites, usec per object.
+
+import timeit
+
+Setup = """
+from scad import Cube, Cylinder, Sphere, Circle, Pipe, Frame, Arc, Translate
+"""
+
+Cases = [
+    ("Cube", "Cube((1, 2, 3))"),
+    ("Translate", "Translate(x=1)"),
+    ("Cylinder", "Cylinder(r=1, h=2)"),
+    ("Sphere", "Sphere(r=1)"),
+    ("Circle", "Circle(r=1)"),
+    ("Pipe", "Pipe(or1=8, ir1=7, h=20.0)"),
+    ("Frame", "Frame()"),
+    ("Arc", "Arc()"),
+]
+
+def run(number=2000, repeat=3):
+    results = []
+    for (label, stmt) in Cases:
+        best = min(timeit.repeat(stmt, Setup, number=number, repeat=repeat))
+        results.append((label, best / number * 1e6))
+    return results
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.CRITICAL)
+    for (label, usec) in run():
+        print "%-20s %8.2f usec" % (label, usec)
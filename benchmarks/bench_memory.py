@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+# bytes per node for large scenes, measured as the growth of the resident set
+# while holding many nodes (one process per case, so the numbers don't mix).
+
+import os
+import gc
+import sys
+import subprocess
+
+Cases = {
+    "Cube": "Cube((1, 2, 3))",
+    "Translate": "Translate(x=1)",
+    "Cylinder": "Cylinder(r=1, h=2)",
+    "Translate(Cube)": "Translate(x=1)(Cube((1, 2, 3)))",
+}
+
+def rss():
+    with open("/proc/self/statm") as fh:
+        return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def measure(stmt, count):
+    import logging
+    logging.disable(logging.CRITICAL)
+    from scad import Cube, Translate, Cylinder
+    # warm up caches and class level state
+    warm = [eval(stmt) for idx in range(100)]
+    gc.collect()
+    before = rss()
+    nodes = [eval(stmt) for idx in range(count)]
+    gc.collect()
+    after = rss()
+    return float(after - before) / count
+
+def run(count=50000):
+    results = []
+    for label in sorted(Cases):
+        cmd = [sys.executable, __file__, label, str(count)]
+        results.append((label, float(subprocess.check_output(cmd))))
+    return results
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        print measure(Cases[sys.argv[1]], int(sys.argv[2]))
+    else:
+        for (label, size) in run():
+            print "%-20s %8d bytes/node" % (label, size)
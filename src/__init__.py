@@ -7,9 +7,18 @@ from utils import *
 from color import *
 from vector import *
 from geometry import *
+from matrix import *
+from bbox import *
+from transform import *
+from facets import *
 from text import *
 from threads import *
 from gear import *
+from cache import *
+from stats import *
+from mesh import *
+from build import *
+from serialize import *
 import drill_sizes
 
 def configure_logger(name=None, debug=False):
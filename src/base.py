@@ -2,17 +2,165 @@ import sys
 import logging
 import inspect
 import types
-import re
+import hashlib
+import threading
+import weakref
 
 logger = logging.getLogger(__name__)
 
 __all__ = ["SCAD_Object"]
 
+class NameContext(object):
+    # hands out "<Class>_<n>" names. a context entered with 'with' is the current
+    # one for that thread until it exits, so a scene built inside it is named the
+    # same way no matter what was built before or in other threads. anonymous
+    # contexts skip naming altogether, their objects are named None.
+    Local = threading.local()
+
+    def __init__(self, anonymous=False, index=None):
+        self.anonymous = anonymous
+        self.index = index if index != None else {}
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return "NameContext(anonymous=%r)" % self.anonymous
+
+    def next_name(self, name):
+        if self.anonymous:
+            return None
+        with self.lock:
+            idx = self.index.get(name, 1)
+            self.index[name] = idx + 1
+        return "%s_%s" % (name, idx)
+
+    def reset(self):
+        with self.lock:
+            self.index.clear()
+
+    def __enter__(self):
+        self.stack().append(self)
+        return self
+
+    def __exit__(self, *args):
+        self.stack().pop()
+
+    @classmethod
+    def stack(cls):
+        stack = getattr(cls.Local, "stack", None)
+        if stack is None:
+            stack = cls.Local.stack = []
+        return stack
+
+    @classmethod
+    def current(cls):
+        stack = cls.stack()
+        if stack:
+            return stack[-1]
+        return DefaultNameContext
+
+# used outside of any context, shared by every thread
 __name_index__ = {}
+DefaultNameContext = NameContext(index=__name_index__)
+
 def get_name_with_index(name):
-    idx = __name_index__.get(name, 1)
-    __name_index__[name] = idx + 1
-    return "%s_%s" % (name, idx)
+    return NameContext.current().next_name(name)
+
+# bumped whenever any object is renamed, child indexes built before are rebuilt
+__renames__ = [0]
+
+def fingerprint_value(digest, value):
+    if value is None:
+        digest.update("N;")
+    elif isinstance(value, BaseObject):
+        digest.update("O%s;" % value.fingerprint())
+    elif isinstance(value, bool):
+        digest.update("B%d;" % value)
+    elif isinstance(value, (int, long)):
+        digest.update("I%d;" % value)
+    elif isinstance(value, float):
+        digest.update("F%r;" % value)
+    elif isinstance(value, (str, unicode)):
+        if isinstance(value, unicode):
+            value = value.encode("utf-8")
+        digest.update("S%d:%s;" % (len(value), value))
+    elif isinstance(value, (list, tuple)):
+        digest.update("L%d[" % len(value))
+        for item in value:
+            fingerprint_value(digest, item)
+        digest.update("];")
+    elif hasattr(value, "dtype") and hasattr(value, "tobytes"):
+        # numpy arrays
+        digest.update("A%s%r:" % (value.dtype.str, value.shape))
+        digest.update(value.copy(order='C').tobytes())
+        digest.update(";")
+    elif isinstance(value, dict):
+        digest.update("D%d{" % len(value))
+        for key in sorted(value):
+            fingerprint_value(digest, key)
+            fingerprint_value(digest, value[key])
+        digest.update("};")
+    else:
+        digest.update("R%s:%r;" % (type(value).__name__, value))
+
+def cast_value(attr, value, setter):
+    (castfunc, default_type, propagate) = setter
+    if castfunc and type(value) != default_type:
+        # cast variable to proper type
+        try:
+            value = castfunc(value)
+        except TypeError:
+            msg = "Attribute '%s' must be castable to a %s, and can not be a %s" % (attr, default_type, type(value))
+            raise TypeError, msg
+    return value
+
+class LazyDefault(object):
+    # stands in for a default object until it is first read. the object is
+    # memoized, so namespace copies holding the placeholder share it, and
+    # values propagated onto it before that are replayed when it is built.
+    __slots__ = ("info", "value", "pending")
+    Lock = threading.RLock()
+
+    def __init__(self, info):
+        self.info = info
+        self.value = None
+        self.pending = []
+
+    @property
+    def materialized(self):
+        return self.pending is None
+
+    def materialize(self, owner):
+        if self.pending is not None:
+            with self.Lock:
+                if self.pending is not None:
+                    value = owner.default_value(self.info)
+                    for (attr, val) in self.pending:
+                        try:
+                            setattr(value, attr, val)
+                        except KeyError:
+                            pass
+                        except AttributeError:
+                            pass
+                    self.value = value
+                    self.pending = None
+        return self.value
+
+class AliasProperty(object):
+    # class level accessor for a compiled alias, writes still go through __setattr__
+    def __init__(self, key):
+        if type(key) == list:
+            key = key[0]
+        self.key = key
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        if type(self.key) == tuple:
+            return obj.resolve(self.key)
+        return getattr(obj, self.key)
+
+    def __set__(self, obj, val):
+        obj.__setattr__(self.key, val)
 
 class BaseObjectMetaclass(type):
     def __new__(cls, name, bases, ns):
@@ -23,15 +171,54 @@ class BaseObjectMetaclass(type):
         ns["Resserved"] = ns.get("Reserved", {})
         ns["Resserved"].update(cls.mro_walk("Reserved", bases))
         ns["InnerObjects"] = cls.get_inner_objets(name, bases, ns)
+        ns["LazyDefaults"] = cls.get_lazy_defaults(ns)
+        ns["PropagateKeys"] = [key for (key, info) in ns["Defaults"].items() if info.get("propagate", False)]
         # call any hooks
         cls.new_hook(name, bases, ns)
+        cls.alias_hook(name, bases, ns)
+        ns["Setters"] = {key: cls.get_setter(key, info) for (key, info) in ns["Defaults"].items()}
+        (ns["DefaultTable"], ns["FactoryDefaults"]) = cls.get_default_tables(ns)
+        ns["DefaultKeys"] = sorted(ns["Defaults"])
         # add automatic properties
+        ns["AutoProperties"] = set()
         for key in ns["Defaults"]:
             if key in ns:
                 continue
             cls.property_hook(name, bases, ns, key)
+            ns["AutoProperties"].add(key)
         return type.__new__(cls, name, bases, ns)
 
+    @classmethod
+    def get_setter(cls, key, info):
+        # (cast function or None, type, propagate), resolved once per class
+        cast = info.get("cast", True)
+        castfunc = None
+        if cast:
+            castfunc = cast if type(cast) == types.FunctionType else info["type"]
+        return (castfunc, info["type"], info.get("propagate", False))
+
+    # defaults of these types are built once per class and shared by every instance
+    SharedTypes = (bool, int, long, float, str, unicode, tuple, types.NoneType)
+
+    @classmethod
+    def get_default_tables(cls, ns):
+        # instances only store the values that differ from the class defaults.
+        # DefaultTable holds the shared defaults, FactoryDefaults the ones that are
+        # built per instance on first read (factories, mutable and inner objects).
+        table = {}
+        factories = {}
+        for (key, info) in ns["Defaults"].items():
+            if "default" in info:
+                if type(info["default"]) == types.FunctionType:
+                    factories[key] = info
+                else:
+                    table[key] = info["default"]
+            elif info.get("type") in cls.SharedTypes:
+                table[key] = info["type"]()
+            else:
+                factories[key] = info
+        return (table, factories)
+
     @classmethod
     def get_inner_objets(cls, name, bases, ns):
         res = []
@@ -41,6 +228,16 @@ class BaseObjectMetaclass(type):
                 res.append((key, cobj))
         return res
 
+    @classmethod
+    def get_lazy_defaults(cls, ns):
+        # inner objects built by their type or a factory are only built when read
+        res = set()
+        for (key, cobj) in ns["InnerObjects"]:
+            default = ns["Defaults"][key].get("default", cobj)
+            if default is cobj or type(default) == types.FunctionType:
+                res.add(key)
+        return res
+
     @classmethod
     def mro_walk(cls, name, bases):
         dct = {}
@@ -51,33 +248,60 @@ class BaseObjectMetaclass(type):
     def property_hook(cls, name, bases, ns, key):
         def fget(self, attr=key):
             return self[attr]
-        def fset(self, value, attr=key):
-            cast = self.Defaults[attr].get("cast", True)
-            propagate = self.Defaults[attr].get("propagate", False)
-            default_type = self.Defaults[attr]["type"]
-            if cast and type(value) != default_type:
-                # cast variable to proper type
-                castfunc = cast if type(cast) == types.FunctionType else default_type
-                try:
-                    value = castfunc(value)
-                except TypeError:
-                    msg = "Attribute '%s' must be castable to a %s, and can not be a %s" % (attr, default_type, type(value))
-                    raise TypeError, msg
+        def fset(self, value, attr=key, setter=ns["Setters"][key]):
+            if type(value) == LazyDefault:
+                # namespace copies may carry placeholders along
+                if not value.materialized:
+                    self[attr] = value
+                    return
+                value = value.value
+            value = cast_value(attr, value, setter)
             self[attr] = value
-            if propagate:
-                for (oname, cobj) in self.InnerObjects:
-                    try:
-                        setattr(getattr(self, oname), attr, value)
-                    except KeyError:
-                        pass
-                    except AttributeError:
-                        pass
+            if setter[2]:
+                self.propagate(attr, value)
         ns[key] = property(fget, fset)
 
     @classmethod
     def new_hook(cls, name, bases, ns):
         pass
 
+    @classmethod
+    def alias_hook(cls, name, bases, ns):
+        # compile the aliases into lookup tables, so resolving a key costs a dict hit:
+        #   AliasTable: alias -> key, dotted path (tuple) or list of those
+        #   MagicAliases: (prefix, key) pairs for the 'prefix*' aliases, longest prefix first
+        aliases = ns["Aliases"]
+        defaults = ns["Defaults"]
+        table = {}
+        magic = []
+        for alias in aliases:
+            if alias.endswith('*'):
+                magic.append((alias[:-1], aliases[alias]))
+            elif alias not in defaults:
+                table[alias] = cls.compile_alias(alias, aliases, defaults)
+        magic.sort(key=lambda item: (-len(item[0]), item[0]))
+        ns["AliasTable"] = table
+        ns["MagicAliases"] = magic
+        # reads of plain and dotted aliases skip __getattr__ entirely
+        for (alias, key) in table.items():
+            if alias in ns or alias.startswith('_'):
+                continue
+            inherited = [getattr(base, alias) for base in bases if hasattr(base, alias)]
+            if inherited and not isinstance(inherited[0], AliasProperty):
+                continue
+            ns[alias] = AliasProperty(key)
+
+    @classmethod
+    def compile_alias(cls, key, aliases, defaults, seen=()):
+        if key in defaults or key not in aliases or key in seen:
+            if '.' in key:
+                return tuple(key.split('.'))
+            return key
+        target = aliases[key]
+        if type(target) in (str, unicode):
+            return cls.compile_alias(target, aliases, defaults, seen + (key,))
+        return [cls.compile_alias(subkey, aliases, defaults, seen + (key,)) for subkey in target]
+
 class SCAD_BaseObjectMetaclass(BaseObjectMetaclass):
     GlobalAliases = {
         'red': ('r', 'R'),
@@ -126,32 +350,65 @@ class BaseObject(object):
     __metaclass__ = BaseObjectMetaclass
     Defaults = {}
     Aliases = {}
+    # objects nobody looks up by name can skip name generation
+    AutoName = True
     Reserved = {
         "stack": {"type": list},
         "children": {"type": list},
         "name": {"type": str}
     }
+    # until an instance is pushed or given children these shared empty values stand in
+    __stack__ = ()
+    __children__ = ()
+    # bumped when the object, one of its inner objects or one of its descendants changes.
+    # parents and owners are held by weak references, so a write can reach them.
+    __version__ = 0
 
     def __init__(self, **kw):
         super(BaseObject, self).__init__()
-        self.__namespace__ = {}
+        # only values that differ from the class defaults are stored
+        self.__dict__["__namespace__"] = {}
         if not kw.get("name", None):
-            kw["name"] = get_name_with_index(self.__class__.__name__)
-        self.__kw__ = kw
+            kw["name"] = get_name_with_index(self.__class__.__name__) if self.AutoName else None
         rem_kw = self.process_reserved_names(kw)
-        self.__namespace__ = self.process_defaults()
         self.update(rem_kw)
 
-    def process_defaults(self, kw={}):
-        return {key: kw.get(key, self.default_value(self.Defaults[key])) for key in self.Defaults}
-
     def process_reserved_names(self, kw={}):
         for key in self.Reserved:
-            mangled_name = "__%s__" % key.lower()
-            value = kw.get(key, self.default_value(self.Reserved[key]))
-            setattr(self, mangled_name, value)
+            if key in kw:
+                mangled_name = "__%s__" % key.lower()
+                self.__dict__[mangled_name] = kw[key]
         return {key: val for (key, val) in kw.items() if key not in self.Reserved}
 
+    def propagate(self, attr, value):
+        self.propagate_many([(attr, value)])
+
+    def propagate_many(self, items):
+        # hand values down to the inner objects, one batched update per object
+        for (oname, cobj) in self.InnerObjects:
+            inner = self.__namespace__.get(oname)
+            if inner is None and oname in self.FactoryDefaults:
+                # not built yet, queue the values on a placeholder
+                inner = LazyDefault(self.FactoryDefaults[oname])
+                self.writable_namespace()[oname] = inner
+            if type(inner) == LazyDefault and not inner.materialized:
+                inner.pending.extend(items)
+                continue
+            inner = getattr(self, oname)
+            if len(items) > 1 and isinstance(inner, BaseObject):
+                try:
+                    inner.update(dict(items))
+                    continue
+                except (KeyError, AttributeError):
+                    pass
+            for (attr, value) in items:
+                try:
+                    setattr(inner, attr, value)
+                except KeyError:
+                    pass
+                except AttributeError:
+                    pass
+
     def default_value(self, info):
         _type = info.get("type")
         default = info["default"] if "default" in info else _type()
@@ -161,45 +418,221 @@ class BaseObject(object):
 
     # dict / object interface
     def update(self, ref):
+        # plain keys with automatic properties are cast up front, written together
+        # and propagated once, everything else goes through setattr afterwards
+        batch = []
+        rest = []
         for (key, val) in ref.items():
-            setattr(self, key, val)
-
+            attr = self.lookup_alias(key)
+            if type(attr) == str and attr in self.AutoProperties:
+                batch.append((attr, val))
+            else:
+                rest.append((attr, val))
+        if batch:
+            self.update_batch(batch)
+        for (attr, val) in rest:
+            if type(attr) == list:
+                for subkey in attr:
+                    self.set_path(subkey, val)
+            else:
+                self.set_path(attr, val)
+
+    def update_batch(self, items):
+        values = []
+        propagated = []
+        for (attr, value) in items:
+            setter = self.Setters[attr]
+            if type(value) == LazyDefault:
+                if not value.materialized:
+                    values.append((attr, value))
+                    continue
+                value = value.value
+            value = cast_value(attr, value, setter)
+            values.append((attr, value))
+            if setter[2]:
+                propagated.append((attr, value))
+        # every value is valid, write them all at once
+        self.writable_namespace().update(values)
+        for (attr, value) in values:
+            self.adopt(value)
+        self.touch()
+        if propagated:
+            self.propagate_many(propagated)
+
+    # pickling, the namespace is stored as is, without running the setters again
     def __getstate__(self):
-        state = {}
-        state["__stack__"] = self.stack
-        state["__children__"] = self.children
-        state["__name__"] = self.name
-        state["__namespace__"] = dict(self)
-        return obj
-        
+        self.materialize(self.__namespace__)
+        for snapshot in self.__stack__:
+            self.materialize(snapshot)
+        return (self.__name__, self.__namespace__, tuple(self.__children__), list(self.__stack__))
+
     def __setstate__(self, state):
-        self.stack = state["__stack__"]
-        self.children = state["__children__"]
-        self.name = state["__name__"]
-        self.update(state["__namespace__"])
-
-    def copy(self, descend=True, stack=True):
-        obj = self.__new__()
-        obj.__init__(*self.__args, **self.__kw__)
-        obj.update(self.__namespace__)
-        obj.__dict__["__name__"] = self.__name__
+        (name, namespace, children, stack) = state
+        self.__dict__["__name__"] = name
+        self.__dict__["__namespace__"] = namespace
+        for value in namespace.values():
+            self.adopt(value)
+        if children:
+            self.__dict__["__children__"] = tuple(children)
+            for child in children:
+                child.add_parent(self)
         if stack:
-            obj.__dict__["__stack__"] = self.__stack__[:]
-        if descend:
-            obj.__dict__["__children__"] = self.apply_children(lambda c: c.copy())
+            self.__dict__["__stack__"] = stack
+            self.__dict__["__shared__"] = stack[-1] is namespace
+
+    def materialize(self, namespace):
+        # swap built placeholders in, so namespaces can be copied or pickled
+        for (key, value) in namespace.items():
+            if type(value) == LazyDefault:
+                namespace[key] = value.materialize(self)
+                self.adopt(namespace[key])
+        return namespace
+
+    def copy(self, descend=True, stack=True, memo=None):
+        # inner objects are copied as well, other values are shared. memo maps the ids
+        # of objects copied so far to their copies, so shared subtrees stay shared.
+        if memo is None:
+            memo = {}
+        elif id(self) in memo:
+            return memo[id(self)][1]
+        cls = self.__class__
+        obj = cls.__new__(cls)
+        # hold on to the original, so its id can't be recycled during the copy
+        memo[id(self)] = (self, obj)
+        namespace = self.copy_namespace(self.__namespace__, memo)
+        # snapshots get their own dicts, the live namespace may be one of them
+        snapshots = []
+        if stack:
+            for snapshot in self.__stack__:
+                snapshots.append(namespace if snapshot is self.__namespace__ else self.copy_namespace(snapshot, memo))
+        children = [child.copy(memo=memo) for child in self.__children__] if descend else ()
+        obj.__setstate__((self.__name__, namespace, children, snapshots))
         return obj
 
+    def copy_namespace(self, namespace, memo):
+        ret = {}
+        for (key, value) in self.materialize(namespace).items():
+            if isinstance(value, BaseObject):
+                value = value.copy(memo=memo)
+            ret[key] = value
+        return ret
+
     def get_namespace(self):
-        return self.__namespace__
+        # every value, defaults included, as a new dict
+        for key in self.FactoryDefaults:
+            self[key]
+        namespace = dict(self.DefaultTable)
+        namespace.update(self.materialize(self.__namespace__))
+        return namespace
 
     def set_namespace(self, ns):
-        self.__namespace__.clear()
+        self.__dict__["__namespace__"] = {}
+        self.__dict__["__shared__"] = False
+        self.touch()
         self.update(ns)
     namespace = property(get_namespace, set_namespace)
 
     def __hash__(self):
         return id(self)
 
+    # versions
+    def touch(self):
+        # a write, every cached value of the object and of the objects holding it is stale
+        todo = [self]
+        seen = set()
+        while todo:
+            obj = todo.pop()
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            obj.__dict__["__version__"] = obj.__version__ + 1
+            todo.extend(obj.get_parents())
+
+    def get_parents(self):
+        # the live objects holding this one, as children or as an inner object
+        parents = self.__dict__.get("__parents__")
+        if parents is None:
+            return []
+        if type(parents) == weakref.ReferenceType:
+            parents = (parents,)
+        else:
+            parents = parents.values()
+        return [parent for parent in [ref() for ref in parents] if parent is not None]
+
+    def add_parent(self, parent):
+        # a single parent is held as a weak reference, several by id. every parent is
+        # listed once, however often it adopts the object.
+        parents = self.__dict__.get("__parents__")
+        if parents is None:
+            self.__dict__["__parents__"] = weakref.ref(parent)
+            return
+        if type(parents) == weakref.ReferenceType:
+            if parents() is parent:
+                return
+            old = parents()
+            parents = self.__dict__["__parents__"] = {}
+            if old is not None:
+                parents[id(old)] = weakref.ref(old)
+        ref = parents.get(id(parent))
+        if ref is not None and ref() is parent:
+            return
+        parents[id(parent)] = weakref.ref(parent)
+        if len(parents) > 4 and not (len(parents) & (len(parents) - 1)):
+            # drop the parents that are gone, every time the table doubles
+            for (key, ref) in parents.items():
+                if ref() is None:
+                    del parents[key]
+
+    def remove_parent(self, parent):
+        parents = self.__dict__.get("__parents__")
+        if parents is None:
+            return
+        if type(parents) == weakref.ReferenceType:
+            if parents() is parent or parents() is None:
+                del self.__dict__["__parents__"]
+            return
+        ref = parents.get(id(parent))
+        if ref is not None and ref() is parent:
+            del parents[id(parent)]
+
+    def adopt(self, value):
+        # inner objects report their changes to the owner
+        if isinstance(value, BaseObject):
+            value.add_parent(self)
+
+    def fingerprint(self):
+        # content based digest of the class, the namespace and the children.
+        # names are ignored and in-place edits of list or dict values are not tracked.
+        cached = self.__dict__.get("__fingerprint__")
+        if cached and cached[0] == self.__version__:
+            return cached[1]
+        version = self.__version__
+        digest = hashlib.sha1()
+        digest.update("%s.%s;" % (self.__class__.__module__, self.__class__.__name__))
+        keys = self.DefaultKeys
+        if len(self.__namespace__) > len(keys) or not self.Defaults.viewkeys() >= self.__namespace__.viewkeys():
+            keys = sorted(set(keys).union(self.__namespace__))
+        for key in keys:
+            digest.update("%s=" % key)
+            fingerprint_value(digest, self[key])
+        digest.update("(")
+        for child in self.iter_children():
+            digest.update(child.fingerprint())
+        digest.update(")")
+        ret = digest.hexdigest()
+        self.__dict__["__fingerprint__"] = (version, ret)
+        return ret
+
+    def memoize(self, key, func):
+        # caches func() on the object until it or one of its descendants changes
+        cached = self.__dict__.get(key)
+        if cached and cached[0] == self.__version__:
+            return cached[1]
+        version = self.__version__
+        ret = func()
+        self.__dict__[key] = (version, ret)
+        return ret
+
     def __cmp__(self, other):
         return cmp(id(self), id(other))
 
@@ -216,70 +649,102 @@ class BaseObject(object):
     # nor will they call setters / getters
     def __getitem__(self, key):
         if '.' in key:
-            return self.__getattr__(key, val)
-        return self.__namespace__[key]
+            return self.resolve(key)
+        namespace = self.__namespace__
+        if key in namespace:
+            value = namespace[key]
+            if type(value) == LazyDefault:
+                value = value.materialize(self)
+                namespace[key] = value
+                self.adopt(value)
+            return value
+        if key in self.DefaultTable:
+            return self.DefaultTable[key]
+        info = self.FactoryDefaults[key]
+        with LazyDefault.Lock:
+            if key not in namespace:
+                namespace[key] = self.default_value(info)
+                self.adopt(namespace[key])
+        return self[key]
 
     def __setitem__(self, key, val):
         if '.' in key:
             self.__setattr__(key, val)
-        self.__namespace__[key] = val
-
-    @property
-    def magic_aliases(self):
-        for alias in self.Aliases:
-            if alias.endswith('*'):
-                regex = "(%s)(.*)" % alias[:-1]
-                yield re.compile(regex)
+            return
+        self.writable_namespace()[key] = val
+        self.adopt(val)
+        self.touch()
+
+    def writable_namespace(self):
+        if self.__dict__.get("__shared__"):
+            # the namespace is still held by the stack, copy it on first write
+            self.__dict__["__namespace__"] = self.__namespace__.copy()
+            self.__dict__["__shared__"] = False
+        return self.__namespace__
 
     def resolve_magic_alias(self, key):
-        m = None
-        for regex in self.magic_aliases:
-            m = regex.match(key)
-            if m:
-                break
-        if m:
-            (key, subkey) = m.groups()
-            if hasattr(getattr(self, key), subkey):
-                return "%s.%s" % (key, subkey)
+        # 'ir1' -> ('inner', 'r1') when the inner object knows about 'r1'
+        for (prefix, target) in self.MagicAliases:
+            if len(key) > len(prefix) and key.startswith(prefix):
+                subkey = key[len(prefix):]
+                if hasattr(getattr(self, target), subkey):
+                    return (target, subkey)
         return key
 
-    def resolve_alias(self, key):
-        #if key in self.Defaults or key in dir(self):
+    def lookup_alias(self, key):
+        # resolves to a key, a dotted path as a tuple, or a list of those
         if key in self.Defaults or key in self.__dict__:
             return key
-        if key not in self.Aliases:
-            key = self.resolve_magic_alias(key)
-            return key
-        key = self.Aliases[key]
-        if type(key) in (str, unicode):
-            return self.resolve_alias(key)
-        return [self.resolve_alias(subkey) for subkey in key]
+        key = self.AliasTable.get(key, key)
+        if type(key) in (str, unicode) and key not in self.Defaults and self.MagicAliases:
+            return self.resolve_magic_alias(key)
+        return key
+
+    def resolve_alias(self, key):
+        key = self.lookup_alias(key)
+        if type(key) == tuple:
+            return str.join('.', key)
+        if type(key) == list:
+            return [str.join('.', subkey) if type(subkey) == tuple else subkey for subkey in key]
+        return key
 
     def __getattr__(self, key):
-        key = self.resolve_alias(key)
-        if type(key) in (str, unicode):
-            if '.' in key:
-                return self.resolve(key)
-            for child in self.iter_children():
-                if child.__name__ == key:
-                    return child
-            return super(BaseObject, self).__getattribute__(key)
-        else:
+        if key.startswith('__') and key.endswith('__'):
+            # never an alias or a child, and the object may not be initialized yet
+            raise AttributeError, key
+        key = self.lookup_alias(key)
+        if type(key) == list:
             # XXX: only return the first key
-            return self.__getattr__(key[0])
+            key = key[0]
+        if type(key) == tuple:
+            return self.resolve(key)
+        if type(key) == str and '.' in key:
+            return self.resolve(key)
+        child = self.get_child(key)
+        if child is not None:
+            return child
+        return super(BaseObject, self).__getattribute__(key)
 
     def __setattr__(self, key, val):
-        key = self.resolve_alias(key)
+        key = self.lookup_alias(key)
+        if type(key) == list:
+            for subkey in key:
+                self.set_path(subkey, val)
+        else:
+            self.set_path(key, val)
+
+    def set_path(self, key, val):
         if type(key) in (str, unicode):
-            if '.' in key:
-                parts = key.split('.')
-                obj = self.resolve(parts[:-1])
-                setattr(obj, parts[-1], val)
-            else:
-                super(BaseObject, self).__setattr__(key, val)
+            if '.' not in key:
+                return super(BaseObject, self).__setattr__(key, val)
+            key = key.split('.')
+        obj = self.resolve(key[:-1])
+        if getattr(obj, "Frozen", False):
+            # immutable values are replaced on their owner
+            owner = self.resolve(key[:-2])
+            setattr(owner, key[-2], obj.replace(**{key[-1]: val}))
         else:
-            for subkey in key:
-                self.__setattr__(subkey, val)
+            setattr(obj, key[-1], val)
 
     # children
     def __call__(self, *args):
@@ -289,26 +754,49 @@ class BaseObject(object):
         return self
 
     def get_children(self):
-        return tuple(self.__children__)
+        children = self.__children__
+        if type(children) != tuple:
+            children = tuple(children)
+        return children
 
     def set_children(self, children):
         if isinstance(children, BaseObject):
             children = (children,)
         self.disown_children()
-        self.__children__ = list(children)
+        children = tuple(children)
+        if children:
+            self.__dict__["__children__"] = children
+            for child in children:
+                child.add_parent(self)
+        self.__dict__.pop("__child_index__", None)
+        self.touch()
     children = property(get_children, set_children)
 
     def iter_children(self):
         return iter(self.__children__)
 
+    def get_child(self, name):
+        # children by name, if several children share a name the first one wins
+        index = self.__dict__.get("__child_index__")
+        if index is None or index[0] != __renames__[0]:
+            table = {}
+            for child in self.__dict__.get("__children__", ()):
+                table.setdefault(child.__name__, child)
+            index = (__renames__[0], table)
+            self.__dict__["__child_index__"] = index
+        return index[1].get(name)
+
     def apply_children(self, call, predicate=None):
         def default_predicate(child):
             return True
         predicate = predicate or default_predicate
-        return [getattr(child, callname)(*args, **kw) for child in self.children if predicate(child)]
+        return [call(child) for child in self.children if predicate(child)]
 
     def disown_children(self):
-        self.__children__ = list()
+        for child in self.__dict__.pop("__children__", ()):
+            child.remove_parent(self)
+        self.__dict__.pop("__child_index__", None)
+        self.touch()
 
     # stack
     def get_stack(self):
@@ -319,15 +807,46 @@ class BaseObject(object):
     stack = property(get_stack, set_stack)
     
     def push(self, descend=False):
-        self.__stack__.append(self.__namespace__.copy())
+        # the namespace is shared with the stack until the next write. defaults that
+        # are built per instance get a placeholder first, so the snapshot shares them.
+        namespace = self.__namespace__
+        for (key, info) in self.FactoryDefaults.items():
+            if key not in namespace:
+                namespace[key] = LazyDefault(info)
+        stack = self.__dict__.get("__stack__")
+        if stack is None:
+            stack = self.__dict__["__stack__"] = []
+        stack.append(namespace)
+        self.__dict__["__shared__"] = True
         if descend:
-            self.apply_children(lambda c: c.push())
+            self.apply_children(lambda c: c.push(descend=True))
 
     def pop(self, descend=False):
-        self.__namespace__.clear()
-        self.update(self.__stack__.pop())
+        current = self.__namespace__
+        stack = self.__dict__.get("__stack__") or []
+        restored = stack.pop()
+        self.__dict__["__namespace__"] = restored
+        self.__dict__["__shared__"] = bool(stack) and stack[-1] is restored
+        if not stack:
+            del self.__dict__["__stack__"]
+        if restored is not current:
+            self.touch()
+            # inner objects are not part of the snapshot, hand them the restored values
+            for key in self.PropagateKeys:
+                if key in restored:
+                    value = restored[key]
+                elif key in self.DefaultTable:
+                    value = self.DefaultTable[key]
+                else:
+                    continue
+                if type(value) == LazyDefault:
+                    if not value.materialized:
+                        continue
+                    value = value.value
+                if value is not current.get(key, self.DefaultTable.get(key)):
+                    self.propagate(key, value)
         if descend:
-            self.apply_children(lambda c: c.pop())
+            self.apply_children(lambda c: c.pop(descend=True))
 
     # name
     def get_name(self):
@@ -335,4 +854,5 @@ class BaseObject(object):
 
     def set_name(self, name):
         self.__name__ = name
+        __renames__[0] += 1
     name = property(get_name, set_name)
@@ -0,0 +1,132 @@
+from matrix import apply_matrix
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+__all__ = [
+    "BoundingBox",
+]
+
+Inf = float("inf")
+
+class BoundingBox(object):
+    # axis aligned box from lower to upper corner. empty boxes have lower > upper,
+    # unbounded ones stand in where the extent can't be known, so answers stay conservative.
+    __slots__ = ("lower", "upper")
+
+    def __init__(self, lower, upper):
+        self.lower = tuple(map(float, lower))
+        self.upper = tuple(map(float, upper))
+
+    @classmethod
+    def empty(cls):
+        return cls((Inf, Inf, Inf), (-Inf, -Inf, -Inf))
+
+    @classmethod
+    def unbounded(cls):
+        return cls((-Inf, -Inf, -Inf), (Inf, Inf, Inf))
+
+    @classmethod
+    def from_points(cls, points):
+        # 2D points lie in the xy plane
+        if numpy != None and isinstance(points, numpy.ndarray):
+            if not len(points):
+                return cls.empty()
+            (lower, upper) = (points.min(axis=0).tolist(), points.max(axis=0).tolist())
+        else:
+            points = [list(point) for point in points]
+            if not points:
+                return cls.empty()
+            axes = zip(*points)
+            (lower, upper) = (map(min, axes), map(max, axes))
+        pad = [0.0] * (3 - len(lower))
+        return cls(lower + pad, upper + pad)
+
+    def __repr__(self):
+        if self.is_empty:
+            return "BoundingBox.empty()"
+        return "BoundingBox(%r, %r)" % (self.lower, self.upper)
+
+    def __eq__(self, other):
+        if not isinstance(other, BoundingBox):
+            return False
+        if self.is_empty or other.is_empty:
+            return self.is_empty and other.is_empty
+        return self.lower == other.lower and self.upper == other.upper
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __getstate__(self):
+        return (self.lower, self.upper)
+
+    def __setstate__(self, state):
+        (self.lower, self.upper) = state
+
+    @property
+    def is_empty(self):
+        return any([(lower > upper) for (lower, upper) in zip(self.lower, self.upper)])
+
+    @property
+    def is_bounded(self):
+        return not [val for val in self.lower + self.upper if abs(val) == Inf]
+
+    @property
+    def size(self):
+        if self.is_empty:
+            return (0.0, 0.0, 0.0)
+        return tuple([(upper - lower) for (lower, upper) in zip(self.lower, self.upper)])
+
+    @property
+    def center(self):
+        return tuple([(lower + upper) / 2.0 for (lower, upper) in zip(self.lower, self.upper)])
+
+    def corners(self):
+        return [(x, y, z) for x in (self.lower[0], self.upper[0]) \
+            for y in (self.lower[1], self.upper[1]) for z in (self.lower[2], self.upper[2])]
+
+    def union(self, other):
+        return BoundingBox(map(min, self.lower, other.lower), map(max, self.upper, other.upper))
+
+    def intersection(self, other):
+        ret = BoundingBox(map(max, self.lower, other.lower), map(min, self.upper, other.upper))
+        if ret.is_empty:
+            return BoundingBox.empty()
+        return ret
+
+    def overlaps(self, other):
+        # boxes that only touch overlap as well
+        return not self.intersection(other).is_empty
+
+    def contains(self, other):
+        if isinstance(other, BoundingBox):
+            return other.is_empty or (self.contains(other.lower) and self.contains(other.upper))
+        point = tuple(other) + (0.0,) * (3 - len(other))
+        return all([(lower <= val <= upper) for (lower, val, upper) in zip(self.lower, point, self.upper)])
+
+    def translate(self, offset):
+        offset = tuple(offset) + (0.0,) * (3 - len(offset))
+        if self.is_empty:
+            return self
+        return BoundingBox(map(sum, zip(self.lower, offset)), map(sum, zip(self.upper, offset)))
+
+    def transform(self, matrix):
+        # the box around the transformed corners
+        if self.is_empty:
+            return self
+        if not self.is_bounded:
+            return BoundingBox.unbounded()
+        return BoundingBox.from_points([apply_matrix(matrix, corner) for corner in self.corners()])
+
+    def minkowski(self, other):
+        if self.is_empty or other.is_empty:
+            return BoundingBox.empty()
+        return BoundingBox(map(sum, zip(self.lower, other.lower)), map(sum, zip(self.upper, other.upper)))
+
+    def flatten(self):
+        # projected onto the xy plane
+        if self.is_empty:
+            return self
+        return BoundingBox(self.lower[:2] + (0.0,), self.upper[:2] + (0.0,))
@@ -0,0 +1,88 @@
+import os
+import logging
+from core import OpenSCAD
+from utils import save_json, load_json
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "BuildManifest",
+    "Build",
+]
+
+class BuildManifest(object):
+    # remembers the digest of the SCAD each output was built from
+    Version = 1
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self.outputs = {}
+        if os.path.exists(self.path):
+            content = load_json(self.path)
+            if content.get("version") == self.Version:
+                self.outputs = content.get("outputs", {})
+
+    def __repr__(self):
+        return "BuildManifest(%r)" % self.path
+
+    def key(self, output):
+        # outputs are stored relative to the manifest
+        return os.path.relpath(os.path.abspath(output), os.path.dirname(self.path))
+
+    def get(self, output):
+        return self.outputs.get(self.key(output))
+
+    def set(self, output, digest):
+        self.outputs[self.key(output)] = digest
+
+    def discard(self, output):
+        self.outputs.pop(self.key(output), None)
+
+    def save(self):
+        save_json({"version": self.Version, "outputs": self.outputs}, self.path, lazy=False)
+
+class Build(object):
+    # renders a set of outputs, skipping those whose SCAD has not changed since the last build
+    def __init__(self, manifest="build.json", engine=None, jobs=None):
+        if not isinstance(manifest, BuildManifest):
+            manifest = BuildManifest(manifest)
+        self.manifest = manifest
+        self.engine = engine or OpenSCAD()
+        self.jobs = jobs
+        self.targets = []
+
+    def add(self, scene, output, **kw):
+        self.targets.append((scene, output, kw))
+        return self
+
+    def digest(self, target):
+        (scene, output, kw) = target
+        return self.engine.render_digest(scene, output, **kw)
+
+    def outdated(self):
+        ret = []
+        for target in self.targets:
+            (scene, output, kw) = target
+            digest = self.digest(target)
+            if not os.path.exists(output) or self.manifest.get(output) != digest:
+                ret.append((target, digest))
+        return ret
+
+    def run(self, force=False):
+        # returns the RenderResults of the outputs that had to be rebuilt
+        if force:
+            todo = [(target, self.digest(target)) for target in self.targets]
+        else:
+            todo = self.outdated()
+        msg = "%d of %d outputs need to be rebuilt" % (len(todo), len(self.targets))
+        logger.info(msg)
+        if not todo:
+            return []
+        results = self.engine.render_many([target for (target, digest) in todo], jobs=self.jobs)
+        for (((scene, output, kw), digest), result) in zip(todo, results):
+            if result.ok:
+                self.manifest.set(output, digest)
+            else:
+                self.manifest.discard(output)
+        self.manifest.save()
+        return results
@@ -0,0 +1,148 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "RenderCache",
+]
+
+class DigestWriter(object):
+    # file object wrapper that hashes everything written through it,
+    # without a file object the data is only hashed
+    def __init__(self, fh=None):
+        self.fh = fh
+        self.digest = hashlib.sha1()
+
+    def write(self, data):
+        self.digest.update(data)
+        if self.fh != None:
+            self.fh.write(data)
+
+    def hexdigest(self):
+        return self.digest.hexdigest()
+
+class RenderCache(object):
+    # content addressed store of OpenSCAD outputs, keyed by the SCAD source
+    # and the command line it was rendered with.
+    DefaultPath = os.path.join(os.path.expanduser("~"), ".cache", "pyscad")
+
+    def __init__(self, path=None, max_size=1 << 30, link=False):
+        self.path = path or self.DefaultPath
+        self.max_size = max_size
+        self.link = link
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+
+    def __repr__(self):
+        return "RenderCache(path=%r, max_size=%r)" % (self.path, self.max_size)
+
+    def key(self, scad_digest, command_line):
+        digest = hashlib.sha1()
+        digest.update(scad_digest)
+        digest.update('\0')
+        digest.update(command_line)
+        return digest.hexdigest()
+
+    def entry(self, key, output):
+        ext = os.path.splitext(output)[-1].lower()
+        return os.path.join(self.path, key + ext)
+
+    def fetch(self, key, output):
+        cached = self.entry(key, output)
+        if not os.path.exists(cached):
+            with self._lock:
+                self.misses += 1
+            return False
+        if os.path.lexists(output):
+            os.unlink(output)
+        linked = False
+        if self.link:
+            try:
+                os.link(cached, output)
+                linked = True
+            except (OSError, AttributeError):
+                pass
+        if not linked:
+            shutil.copyfile(cached, output)
+        # mark as recently used
+        os.utime(cached, None)
+        with self._lock:
+            self.hits += 1
+        msg = "render cache hit for '%s'" % output
+        logger.debug(msg)
+        return True
+
+    def store(self, key, output):
+        cached = self.entry(key, output)
+        (fh, tmp) = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        os.close(fh)
+        try:
+            shutil.copyfile(output, tmp)
+            os.rename(tmp, cached)
+        except:
+            os.unlink(tmp)
+            raise
+        with self._lock:
+            self.stores += 1
+        self.evict()
+
+    def entries(self):
+        ret = []
+        for fn in os.listdir(self.path):
+            if fn.endswith(".tmp"):
+                continue
+            path = os.path.join(self.path, fn)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            ret.append((st.st_mtime, st.st_size, path))
+        return ret
+
+    def size(self):
+        return sum([size for (mtime, size, path) in self.entries()])
+
+    def evict(self):
+        # drop least recently used entries until the cache fits into max_size
+        with self._lock:
+            entries = self.entries()
+            total = sum([size for (mtime, size, path) in entries])
+            entries.sort()
+            for (mtime, size, path) in entries:
+                if total <= self.max_size:
+                    break
+                try:
+                    os.unlink(path)
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+                msg = "render cache evicted '%s'" % path
+                logger.debug(msg)
+
+    def clear(self):
+        with self._lock:
+            for (mtime, size, path) in self.entries():
+                os.unlink(path)
+
+    @property
+    def stats(self):
+        entries = self.entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "size": sum([size for (mtime, size, path) in entries]),
+        }
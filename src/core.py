@@ -1,12 +1,27 @@
 import os
 import math
+import time
+import hashlib
 import sys
+import shutil
 import tempfile
+import pipes
+import threading
+import subprocess
+import multiprocessing
+from multiprocessing.pool import ThreadPool
 import logging
 import inspect
+import itertools
 from utils import which
-from base import BaseObject, BaseObjectMetaclass, SCAD_BaseObjectMetaclass
+from cache import RenderCache, DigestWriter
+from stats import RenderStats
+from mesh import Mesh
+from base import BaseObject, BaseObjectMetaclass, SCAD_BaseObjectMetaclass, NameContext
 from vector import *
+from vector import is_point_array
+from matrix import IdentityMatrix
+from bbox import BoundingBox
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -17,6 +32,11 @@ __all__ = [
     "SCAD_Object",
     "Vector3D_SCAD_Primitive",
     "OpenSCAD",
+    "ModuleEmitter",
+    "CSGOptimizer",
+    "RenderResult",
+    "RenderProcess",
+    "NameContext",
 ]
 
 class SCAD_Object(BaseObject):
@@ -43,17 +63,56 @@ class SCAD_Object(BaseObject):
             ret = '*'
         return ret
 
-    def render_scad(self, *args, **kw):
+    def iter_scad(self, margin=4, level=0):
         # override this if you are an SCAD Primitive or you wish to generate raw SCAD code
         scad = self.scad()
         if (scad == self):
-            raise RuntimeError, "%s has no scad() function, implementation required"
-        return self.scad().render_scad(*args, **kw)
+            raise RuntimeError, "%s has no scad() function, implementation required" % self.__class__.__name__
+        return scad.scad_chunks(margin, level)
+
+    def scad_chunks(self, margin=4, level=0):
+        # objects that still override render_scad() produce their code as a single chunk
+        func = self.__class__.render_scad.im_func
+        if func is not SCAD_Object.render_scad.im_func:
+            # overrides may take (self), (self, margin) or (self, margin, level)
+            spec = inspect.getargspec(func)
+            args = (margin, level)
+            if not spec.varargs:
+                args = args[:max(len(spec.args) - 1, 0)]
+            return iter((self.render_scad(*args),))
+        return self.iter_scad(margin, level)
+
+    def render_scad(self, margin=4, level=0):
+        return str.join('', self.iter_scad(margin, level))
+
+    def render_scad_to(self, fh, margin=4, level=0):
+        for chunk in self.scad_chunks(margin, level):
+            fh.write(chunk)
 
     def scad(self):
         # override this if you are a composite of SCAD Primitives
         return self
 
+    def bbox(self):
+        # the extent, without running OpenSCAD. the real geometry always lies inside,
+        # disabled and background objects are not part of it.
+        if self.disable or self.background:
+            return BoundingBox.empty()
+        return self.memoize("__bbox__", self.get_bbox)
+
+    def get_bbox(self):
+        # override this if you are an SCAD Primitive, composites use their scad() expansion
+        obj = expand_scad(self)
+        if obj is self:
+            return BoundingBox.unbounded()
+        return obj.bbox()
+
+    def children_bbox(self):
+        ret = BoundingBox.empty()
+        for child in self.children:
+            ret = ret.union(child.bbox())
+        return ret
+
     def render(self, *args, **kw):
         engine = OpenSCAD()
         scad = self.scad()
@@ -63,6 +122,8 @@ class SCAD_Primitive(SCAD_Object):
     SCAD_Name = '__SCAD_Primitive__'
 
     def translate_arg_to_scad(self, arg):
+        if isinstance(arg, FrozenVector):
+            return str(list(arg))
         if isinstance(arg, tuple) and len(arg) == 2:
             lhs = self.translate_arg_to_scad(arg[0])
             rhs = self.translate_arg_to_scad(arg[1])
@@ -77,25 +138,340 @@ class SCAD_Primitive(SCAD_Object):
         args = self.get_scad_args()
         ret = str.join(', ', [self.translate_arg_to_scad(arg) for arg in args])
         return ret
-    
-    def render_scad(self, margin=4, level=0):
-        args = self.render_args()
-        macros = {
-            "name": self.SCAD_Name,
-            "margin": (' ' * margin) * level,
-            "args": args,
-            "modifier": self.scad_modifier,
-        }
-        if self.children:
-            macros["body"] = str.join('\n', [child.render_scad(margin, level + 1) for child in self.children])
-            scad = "%(margin)s%(modifier)s %(name)s(%(args)s) {\n%(body)s\n%(margin)s}\n"
-        else:
-            scad = "%(margin)s%(modifier)s %(name)s(%(args)s);"
-        return scad % macros
+
+    def iter_args(self):
+        # override this to stream large argument lists
+        yield self.render_args()
+
+    def iter_batches(self, items, chunksize=1024):
+        # lists of vectors as nested python lists, a chunk at a time
+        if is_point_array(items):
+            for idx in xrange(0, len(items), chunksize):
+                yield items[idx:idx + chunksize].tolist()
+            return
+        items = iter(items)
+        while True:
+            batch = [list(item) for item in itertools.islice(items, chunksize)]
+            if not batch:
+                return
+            yield batch
+
+    def iter_list(self, items, chunksize=1024):
+        # stream a (possibly huge) list of vectors using the same layout as str(list)
+        yield '['
+        sep = ''
+        for batch in self.iter_batches(items, chunksize):
+            yield sep + str(batch)[1:-1]
+            sep = ', '
+        yield ']'
+
+    def iter_head(self):
+        yield "%s %s(" % (self.scad_modifier, self.SCAD_Name)
+        for chunk in self.iter_args():
+            yield chunk
+        yield ")"
+
+    def iter_scad(self, margin=4, level=0):
+        _margin = (' ' * margin) * level
+        yield _margin
+        for chunk in self.iter_head():
+            yield chunk
+        if not self.children:
+            yield ";"
+            return
+        yield " {\n"
+        for (idx, child) in enumerate(self.children):
+            if idx:
+                yield '\n'
+            for chunk in child.scad_chunks(margin, level + 1):
+                yield chunk
+        yield "\n%s}\n" % _margin
 
     def get_scad_args(self):
         return []
 
+def expand_scad(obj):
+    # replace composites by their scad() expansion, objects that
+    # generate their own SCAD code are returned as they are
+    while not isinstance(obj, SCAD_Primitive) and \
+            obj.__class__.iter_scad.im_func is SCAD_Object.iter_scad.im_func and \
+            obj.__class__.render_scad.im_func is SCAD_Object.render_scad.im_func:
+        scad = obj.scad()
+        if scad == obj:
+            break
+        obj = scad
+    return obj
+
+def is_structural(obj):
+    # primitives whose SCAD is their head plus their children
+    cls = obj.__class__
+    return isinstance(obj, SCAD_Primitive) and \
+        cls.iter_scad.im_func is SCAD_Primitive.iter_scad.im_func and \
+        cls.render_scad.im_func is SCAD_Object.render_scad.im_func
+
+def is_prelude(obj):
+    # objects whose SCAD is a prelude followed by their children, like SCAD_Globals
+    return isinstance(obj, SCAD_Primitive) and hasattr(obj, "iter_prelude")
+
+class CSGOptimizer(object):
+    # simplifies the expanded CSG tree of a scene before it is emitted, the scene
+    # itself is left alone, changed nodes are copies. shared subtrees stay shared.
+    # with cull set, bounding boxes are used to drop operands that can't change the result.
+    Associative = ("union", "intersection")
+    Collapsible = ("union", "intersection", "difference", "render")
+    # 2D geometry, OpenSCAD drops the z part of the transforms applied to it
+    Planar = ("circle", "polygon", "projection")
+    # operators that produce nothing without children
+    Operators = ("union", "difference", "intersection", "minkowski", "hull", "render", \
+        "translate", "rotate", "scale", "mirror", "multmatrix", "color", "projection", "linear_extrude")
+
+    def __init__(self, scene, cull=True):
+        self.scene = scene
+        self.cull = cull
+        self.removed = 0
+        self.culled = 0
+
+    def optimize(self):
+        self.removed = 0
+        self.culled = 0
+        ret = self.visit(self.scene, {})
+        msg = "CSG optimizer removed %d nodes, %d operands were culled" % (self.removed, self.culled)
+        logger.debug(msg)
+        return ret
+
+    def size(self, obj):
+        obj = expand_scad(obj)
+        return 1 + sum([self.size(child) for child in obj.children])
+
+    def is_plain(self, obj, names=None):
+        return is_structural(obj) and not obj.scad_modifier and (names == None or obj.SCAD_Name in names)
+
+    def is_empty(self, obj):
+        return is_structural(obj) and obj.SCAD_Name in self.Operators and not obj.children
+
+    def is_identity(self, obj):
+        if not self.is_plain(obj, ("translate", "scale", "rotate", "multmatrix")):
+            return False
+        args = obj.get_scad_args()
+        if obj.SCAD_Name == "multmatrix":
+            return obj.matrix == IdentityMatrix
+        if obj.SCAD_Name == "translate":
+            return args == [(0.0, 0.0, 0.0)]
+        if obj.SCAD_Name == "scale":
+            return args == [(1.0, 1.0, 1.0)]
+        return args[0][1] in (0, (0.0, 0.0, 0.0))
+
+    def visit(self, node, memo):
+        if id(node) in memo:
+            return memo[id(node)][1]
+        obj = expand_scad(node)
+        ret = obj
+        if obj.children:
+            children = self.visit_children(obj, memo)
+            if len(children) != len(obj.children) or \
+                    [new for (new, old) in zip(children, obj.children) if new is not old]:
+                ret = obj.copy(descend=False, stack=False)
+                ret.set_children(children)
+            ret = self.simplify(ret)
+        # hold on to the node, so its id can't be recycled during the walk
+        memo[id(node)] = (node, ret)
+        return ret
+
+    def visit_children(self, obj, memo):
+        children = [self.visit(child, memo) for child in obj.children]
+        if not is_structural(obj):
+            return children
+        name = obj.SCAD_Name
+        if name == "difference" and self.is_empty(children[0]):
+            # nothing to subtract from
+            self.removed += sum([self.size(child) for child in children])
+            return []
+        if self.cull and name == "difference":
+            children = self.cull_difference(children)
+        elif self.cull and name == "intersection":
+            children = self.cull_intersection(children)
+        ret = []
+        # spliced children are checked again, they may be empty or spliceable themselves
+        todo = list(reversed(children))
+        while todo:
+            child = todo.pop()
+            if self.is_empty(child) and name in ("union", "hull", "difference"):
+                self.removed += self.size(child)
+            elif (name in self.Associative and self.is_plain(child, (name,))) or \
+                    (name == "union" and self.is_identity(child)):
+                self.removed += 1
+                todo.extend(reversed(child.children))
+            else:
+                ret.append(child)
+        return ret
+
+    def is_planar(self, obj):
+        # the 3D boxes of 2D geometry can be off in z, they are not used for culling
+        obj = expand_scad(obj)
+        if not is_structural(obj) or obj.SCAD_Name == "linear_extrude":
+            return False
+        if obj.SCAD_Name in self.Planar:
+            return True
+        return bool(obj.children) and self.is_planar(obj.children[0])
+
+    def can_cull(self, obj):
+        return not obj.scad_modifier and not self.is_planar(obj)
+
+    def cull_difference(self, children):
+        # subtrahends outside the minuend's box don't subtract anything
+        if not self.can_cull(children[0]):
+            return children
+        bbox = children[0].bbox()
+        ret = children[:1]
+        for child in children[1:]:
+            if self.can_cull(child) and not bbox.overlaps(child.bbox()):
+                self.culled += 1
+                self.removed += self.size(child)
+            else:
+                ret.append(child)
+        return ret
+
+    def cull_intersection(self, children):
+        # operands whose boxes have nothing in common intersect to nothing
+        if [child for child in children if not self.can_cull(child)]:
+            return children
+        bbox = children[0].bbox()
+        for child in children[1:]:
+            bbox = bbox.intersection(child.bbox())
+        if not bbox.is_empty:
+            return children
+        self.culled += len(children)
+        self.removed += sum([self.size(child) for child in children])
+        return []
+
+    def simplify(self, obj):
+        if len(obj.children) != 1:
+            return obj
+        if self.is_identity(obj) or self.is_plain(obj, self.Collapsible):
+            self.removed += 1
+            return obj.children[0]
+        return obj
+
+class ModuleEmitter(object):
+    # hash-conses identical subtrees of a scene and emits each of them once
+    # as an OpenSCAD module, every occurrence becomes a module call
+    def __init__(self, scene, min_size=64, margin=4):
+        self.scene = scene
+        self.min_size = min_size
+        self.margin = margin
+
+    def is_structural(self, obj):
+        return is_structural(obj)
+
+    def visit(self, node, memo):
+        if id(node) in memo:
+            return memo[id(node)][0]
+        obj = expand_scad(node)
+        digest = hashlib.sha1()
+        size = 0
+        children = []
+        if self.is_structural(obj):
+            digest.update("node:")
+            for chunk in obj.iter_head():
+                digest.update(chunk)
+                size += len(chunk)
+            children = [self.visit(child, memo) for child in obj.children]
+            digest.update("{%s}" % str.join(',', children))
+        elif is_prelude(obj):
+            digest.update("prelude:")
+            for chunk in obj.iter_prelude():
+                digest.update(chunk)
+                size += len(chunk)
+            children = [self.visit(child, memo) for child in obj.children]
+            digest.update("{%s}" % str.join(',', children))
+        else:
+            digest.update("code:")
+            for chunk in obj.scad_chunks(0, 0):
+                digest.update(chunk)
+                size += len(chunk)
+        key = digest.hexdigest()
+        # hold on to the objects, so their ids can't be recycled during the walk
+        memo[id(node)] = (key, node, obj)
+        if key not in self.nodes:
+            self.nodes[key] = obj
+            self.edges[key] = children
+            self.sizes[key] = size
+            self.order.append(key)
+        return key
+
+    def analyze(self):
+        self.nodes = {}
+        self.edges = {}
+        self.sizes = {}
+        self.order = []
+        self.root = self.visit(self.scene, {})
+        # count how often each unique subtree is emitted, parents first
+        refs = dict.fromkeys(self.order, 0)
+        refs[self.root] = 1
+        self.modules = {}
+        for key in reversed(self.order):
+            if refs[key] > 1 and (self.edges[key] or self.sizes[key] >= self.min_size):
+                self.modules[key] = "m_%s" % key[:12]
+            weight = 1 if key in self.modules else refs[key]
+            for child in self.edges[key]:
+                refs[child] += weight
+        msg = "%d unique subtrees, %d emitted as modules" % (len(self.order), len(self.modules))
+        logger.debug(msg)
+
+    def iter_node(self, key, level, define=False):
+        _margin = (' ' * self.margin) * level
+        if key in self.modules and not define:
+            yield "%s%s();" % (_margin, self.modules[key])
+            return
+        obj = self.nodes[key]
+        if is_prelude(obj):
+            # the children follow the prelude on the same level
+            for chunk in obj.iter_prelude():
+                yield chunk
+            for (idx, child) in enumerate(self.edges[key]):
+                if idx:
+                    yield '\n'
+                for chunk in self.iter_node(child, level):
+                    yield chunk
+            return
+        if not self.is_structural(obj):
+            for chunk in obj.scad_chunks(self.margin, level):
+                yield chunk
+            return
+        yield _margin
+        for chunk in obj.iter_head():
+            yield chunk
+        if not self.edges[key]:
+            yield ";"
+            return
+        yield " {\n"
+        for (idx, child) in enumerate(self.edges[key]):
+            if idx:
+                yield '\n'
+            for chunk in self.iter_node(child, level + 1):
+                yield chunk
+        yield "\n%s}\n" % _margin
+
+    def iter_scad(self):
+        self.analyze()
+        # dependencies are defined before the modules that call them
+        for key in self.order:
+            if key not in self.modules:
+                continue
+            yield "module %s() {\n" % self.modules[key]
+            for chunk in self.iter_node(key, 1, define=True):
+                yield chunk
+            yield "\n}\n"
+        for chunk in self.iter_node(self.root, 0):
+            yield chunk
+
+    def render_scad(self):
+        return str.join('', self.iter_scad())
+
+    def render_scad_to(self, fh):
+        for chunk in self.iter_scad():
+            fh.write(chunk)
+
 class Vector3D_SCAD_Primitive(SCAD_Primitive):
     SCAD_Name = "translate"
     Aliases = {
@@ -104,7 +480,7 @@ class Vector3D_SCAD_Primitive(SCAD_Primitive):
         'z': 'vector.z',
     }
     Defaults = {
-        "vector": {"type": Vector3D, "default": lambda: Vector3D([0.0, 0.0, 0.0])},
+        "vector": {"type": FrozenVector3D, "default": FrozenVector3D([0.0, 0.0, 0.0])},
     }
 
     def __init__(self, args=(), **kw):
@@ -142,9 +518,17 @@ class OpenSCAD(SCAD_Primitive):
         "_render": {"type": bool, "default": True},
         "csglimit": {"type": int, "default": None, "cast": False},
         "input": {"type": str, "default": None, "cast": False},
+        "modules": {"type": bool, "default": False},
+        "cache": {"type": RenderCache, "default": None, "cast": False},
+        "stats": {"type": bool, "default": False},
+        "optimize": {"type": bool, "default": False},
+        "fold": {"type": bool, "default": False},
     }
 
     def render_command_line(self):
+        return str.join(' ', [pipes.quote(str(arg)) for arg in self.render_command_args()])
+
+    def render_command_args(self):
         cmd = [self.command]
         # exclusive options
         if self.info:
@@ -161,13 +545,15 @@ class OpenSCAD(SCAD_Primitive):
             if self.make:
                 cmd.extend(("-m", self.make))
             if self.define:
-                defs = ["'%s=\"%s\"'" % i for i in self.define.items()]
-                cmd.extend(("-D", defs))
+                for (key, val) in sorted(self.define.items()):
+                    if type(val) in (str, unicode):
+                        val = '"%s"' % val
+                    cmd.extend(("-D", "%s=%s" % (key, val)))
             if self.camera != None:
                 opts = list(self.camera.eye) + list(self.camera.center)
                 if self.camera.distance:
                     opts.append(self.camera.distance)
-                cmd.append("--camera=%s" % str.join(',', opts))
+                cmd.append("--camera=%s" % str.join(',', map(str, opts)))
             if self.imgsize != None:
                 cmd.append("--imgsize=%d,%d" % tuple(self.imgsize))
             if self.projection != None:
@@ -178,7 +564,7 @@ class OpenSCAD(SCAD_Primitive):
                 cmd.append("--preview")
             if self.csglimit:
                 cmd.append("--csglimit=%s" % self.csglimit)
-        return str.join(' ', cmd)
+        return cmd
 
     # preview
     def get_preview(self):
@@ -219,38 +605,341 @@ class OpenSCAD(SCAD_Primitive):
         else:
             return "openscad"
 
-    def render(self, scene, output=None, background=False, **kw):
-        scad = scene.render_scad()
-        if output and os.path.splitext(output)[-1].lower() == ".scad":
-            with open(output, 'w') as f:
-                f.write(scad)
-            return
-        # need to run OpenSCAD
+    def write_scad(self, scene, fh):
+        if self.optimize:
+            scene = CSGOptimizer(scene).optimize()
+        if self.fold:
+            # transform builds on the primitives, which need this module first
+            from transform import TransformFolder
+            scene = TransformFolder(scene).fold()
+        if self.modules:
+            ModuleEmitter(scene).render_scad_to(fh)
+        else:
+            scene.render_scad_to(fh)
+
+    def cache_command_line(self):
+        # the command line without the paths that change from run to run
+        self.push()
+        try:
+            self.input = "<input>"
+            if self.output:
+                self.output = "<output>%s" % os.path.splitext(self.output)[-1].lower()
+            return self.render_command_line()
+        finally:
+            self.pop()
+
+    def render_digest(self, scene, output=None, **kw):
+        # identifies what render() would produce: the SCAD source and the command line
         kw["output"] = output
         self.push()
         try:
             self.update(kw)
+            writer = DigestWriter()
+            self.write_scad(scene, writer)
+            digest = hashlib.sha1()
+            digest.update(writer.hexdigest())
+            digest.update('\0')
+            digest.update(self.cache_command_line())
+            return digest.hexdigest()
+        finally:
+            self.pop()
+
+    def clone(self):
+        return self.__class__(**self.namespace)
+
+    def render(self, scene, output=None, background=False, timeout=None, **kw):
+        # with background set, the running RenderProcess is returned right away
+        process = self.render_async(scene, output, timeout=timeout, **kw)
+        if background:
+            return process
+        return process.wait()
+
+    def render_async(self, scene, output=None, timeout=None, **kw):
+        result = RenderResult(output)
+        kw["output"] = output
+        self.push()
+        try:
+            self.update(kw)
+            if output and os.path.splitext(output)[-1].lower() == ".scad":
+                with open(output, 'w') as f:
+                    self.write_scad(scene, f)
+                result.returncode = 0
+                return RenderProcess.finished(result)
+            # need to run OpenSCAD
             (fh, fn) = tempfile.mkstemp()
             try:
-                os.write(fh, scad)
-                os.close(fh)
+                with os.fdopen(fh, 'w') as f:
+                    writer = DigestWriter(f)
+                    self.write_scad(scene, writer)
+                on_success = None
+                if self.cache and output:
+                    (cache, cache_key) = (self.cache, self.cache.key(writer.hexdigest(), self.cache_command_line()))
+                    if cache.fetch(cache_key, output):
+                        os.unlink(fn)
+                        result.returncode = 0
+                        result.cached = True
+                        return RenderProcess.finished(result)
+                    on_success = lambda: cache.store(cache_key, output)
+                if not self.command:
+                    raise RuntimeError, "Could not find the OpenSCAD executable '%s'" % (self._command or self.open_scad_exe())
                 self.input = fn
-                cli = self.render_command_line()
-                if background:
-                    cli += "; rm %s &" % fn
-                msg = "executing '%s'" % cli
-                logger.debug(msg)
-                retcode = os.system(cli)
-                if retcode != 0:
-                    msg = "OpenSCAD returned a non-zero exit code (%s)" % retcode
-                    logger.error(msg)
-            finally:
-                if not background:
-                    os.unlink(fn)
+                partial = None
+                if output:
+                    # OpenSCAD writes next to the output, it is only moved there once complete
+                    partial = self.partial_output(output)
+                    self.output = partial
+                args = self.render_command_args()
+                stats_fn = "%s.stats.json" % output if (self.stats and output) else None
+            except:
+                os.unlink(fn)
+                raise
         finally:
             self.pop()
+        process = RenderProcess(args, result, tempfiles=(fn,), timeout=timeout, on_success=on_success, stats_fn=stats_fn, partial=partial)
+        return process.start()
+
+    def partial_output(self, output):
+        # a free path in the output's directory, with the same extension so OpenSCAD picks the same format
+        (dirname, basename) = os.path.split(os.path.abspath(output))
+        (fh, fn) = tempfile.mkstemp(suffix=os.path.splitext(basename)[-1], prefix=".%s." % basename, dir=dirname)
+        os.close(fh)
+        os.unlink(fn)
+        return fn
+
+    def render_many(self, renders, jobs=None, **kw):
+        # renders is a sequence of (scene, output) or (scene, output, kw) tuples,
+        # every job gets its own engine and OpenSCAD process
+        jobs = jobs or multiprocessing.cpu_count()
+        def run(job):
+            (scene, output) = job[:2]
+            _kw = kw.copy()
+            if len(job) > 2:
+                _kw.update(job[2])
+            result = RenderResult(output)
+            try:
+                result = self.clone().render(scene, output, **_kw)
+            except Exception, err:
+                result.error = err
+                result.finish()
+                msg = "rendering '%s' failed: %s" % (output, err)
+                logger.error(msg)
+            return result
+        pool = ThreadPool(max(1, min(jobs, len(renders))))
+        try:
+            return pool.map(run, renders)
+        finally:
+            pool.close()
+            pool.join()
+
+    def shards(self, scene):
+        # the top level parts of a (possibly nested) plain union
+        parts = self.find_shards(scene)
+        if parts is None:
+            return [expand_scad(scene)]
+        return parts
+
+    def find_shards(self, obj):
+        # disabled and background parts are not part of the output and are left out,
+        # other modifiers change how the scene renders as a whole (None)
+        obj = expand_scad(obj)
+        if obj.disable or obj.background:
+            return []
+        if obj.scad_modifier:
+            return None
+        if not (isinstance(obj, SCAD_Primitive) and obj.SCAD_Name == "union"):
+            return [obj]
+        parts = []
+        for child in obj.children:
+            shards = self.find_shards(child)
+            if shards is None:
+                return None
+            parts.extend(shards)
+        return parts
+
+    def render_sharded(self, scene, output, jobs=None, **kw):
+        # render the parts of a union separately and concatenate the meshes,
+        # this is only valid if the parts don't touch, otherwise fall back to a normal render
+        parts = self.shards(scene)
+        if len(parts) < 2 or os.path.splitext(output)[-1].lower() != ".stl":
+            return self.render(scene, output, **kw)
+        result = RenderResult(output)
+        tdir = tempfile.mkdtemp()
+        try:
+            renders = [(part, os.path.join(tdir, "shard_%d.stl" % idx)) for (idx, part) in enumerate(parts)]
+            result.shards = self.render_many(renders, jobs=jobs, **kw)
+            failed = [shard for shard in result.shards if not shard.ok]
+            overlap = None
+            if failed:
+                msg = "shard '%s' of '%s' failed to render, rendering as a whole" % (failed[0].output, output)
+                logger.warning(msg)
+            else:
+                meshes = [Mesh.read(fn) for (part, fn) in renders]
+                overlap = Mesh.overlapping([mesh.bounds() for mesh in meshes])
+                if overlap:
+                    msg = "parts %d and %d of '%s' overlap, rendering as a whole" % (overlap[0], overlap[1], output)
+                    logger.debug(msg)
+            if failed or overlap:
+                shards = result.shards
+                result = self.render(scene, output, **kw)
+                result.shards = shards
+                return result
+            merged = Mesh()
+            for mesh in meshes:
+                merged.extend(mesh)
+            merged.write(output)
+            result.returncode = 0
+        finally:
+            shutil.rmtree(tdir)
+        return result.finish()
+
+class RenderResult(object):
+    def __init__(self, output=None):
+        self.output = output
+        self.returncode = None
+        self.stdout = ''
+        self.stderr = ''
+        self.cached = False
+        self.cancelled = False
+        self.timed_out = False
+        self.error = None
+        # RenderStats, only available when OpenSCAD actually ran
+        self.stats = None
+        # per part results of a sharded render
+        self.shards = None
+        self.started = time.time()
+        self.elapsed = None
+
+    def __repr__(self):
+        return "RenderResult(output=%r, returncode=%r, elapsed=%r, cached=%r, cancelled=%r, timed_out=%r, error=%r)" % \
+            (self.output, self.returncode, self.elapsed, self.cached, self.cancelled, self.timed_out, self.error)
+
+    def finish(self):
+        self.elapsed = time.time() - self.started
+        return self
+
+    @property
+    def ok(self):
+        return self.error == None and self.returncode == 0
+
+class RenderProcess(object):
+    # handle on a running OpenSCAD process. a watcher thread collects the
+    # output, enforces the timeout and removes the temporary files.
+    def __init__(self, args, result, tempfiles=(), timeout=None, on_success=None, stats_fn=None, partial=None):
+        self.args = args
+        self.result = result
+        # the path OpenSCAD writes to, moved to result.output after a successful run
+        self.partial = partial
+        self.tempfiles = tuple(tempfiles) + ((partial,) if partial else ())
+        self.timeout = timeout
+        self.on_success = on_success
+        self.stats_fn = stats_fn
+        self.process = None
+        self._done = threading.Event()
+        self._lock = threading.Lock()
+        self._timer = None
+
+    @classmethod
+    def finished(cls, result):
+        process = cls(None, result)
+        result.finish()
+        process._done.set()
+        return process
+
+    def start(self):
+        msg = "executing '%s'" % str.join(' ', [pipes.quote(str(arg)) for arg in self.args])
+        logger.debug(msg)
+        try:
+            self.process = subprocess.Popen(self.args, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except:
+            self.cleanup()
+            raise
+        if self.timeout != None:
+            self._timer = threading.Timer(self.timeout, self.expire)
+            self._timer.daemon = True
+            self._timer.start()
+        watcher = threading.Thread(target=self.watch)
+        watcher.start()
+        return self
+
+    def watch(self):
+        result = self.result
+        try:
+            (result.stdout, result.stderr) = self.process.communicate()
+            result.returncode = self.process.returncode
+            result.finish()
+            if self._timer:
+                self._timer.cancel()
+            result.stats = RenderStats.parse(result.stdout + '\n' + result.stderr, result.elapsed)
+            for warning in result.stats.warnings:
+                msg = "OpenSCAD: %s" % warning
+                logger.warning(msg)
+            if self.stats_fn:
+                result.stats.save(self.stats_fn)
+            if result.cancelled or result.timed_out:
+                msg = "OpenSCAD was %s after %.1fs" % ("cancelled" if result.cancelled else "stopped", time.time() - result.started)
+                logger.error(msg)
+            elif result.returncode != 0:
+                msg = "OpenSCAD returned a non-zero exit code (%s)" % result.returncode
+                logger.error(msg)
+            elif self.partial and os.path.exists(self.partial):
+                # OpenSCAD exits cleanly without an output for empty scenes
+                if sys.platform.startswith("win") and os.path.exists(result.output):
+                    os.unlink(result.output)
+                os.rename(self.partial, result.output)
+                if self.on_success:
+                    self.on_success()
+        except Exception, err:
+            result.error = err
+        finally:
+            self.cleanup()
+            if result.elapsed == None:
+                result.finish()
+            self._done.set()
+
+    def cleanup(self):
+        for fn in self.tempfiles:
+            if os.path.exists(fn):
+                os.unlink(fn)
+
+    def kill(self):
+        with self._lock:
+            if self.process != None and self.process.poll() == None:
+                try:
+                    self.process.kill()
+                except OSError:
+                    pass
+
+    def expire(self):
+        if not self.done():
+            self.result.timed_out = True
+            self.kill()
+
+    def cancel(self):
+        if self.done():
+            return False
+        self.result.cancelled = True
+        self.kill()
+        self._done.wait()
+        return True
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        # returns the RenderResult, or None if the process is still running after timeout.
+        # interrupting the wait kills the process.
+        deadline = None if timeout == None else time.time() + timeout
+        try:
+            while not self._done.wait(0.1):
+                if deadline != None and time.time() >= deadline:
+                    return None
+        except KeyboardInterrupt:
+            self.cancel()
+            raise
+        return self.result
 
 class RadialResolution(SCAD_Primitive):
+    AutoName = False
     Defaults = {
         "fn": {"type": float, "default": 0.0},
         "fs": {"type": float, "default": 2.0},
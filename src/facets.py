@@ -0,0 +1,108 @@
+import math
+import logging
+from core import RadialResolution, expand_scad
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "FacetBudget",
+]
+
+class FacetBudget(object):
+    # spreads a facet budget over the round features of a scene (anything with a
+    # fragment_args() and estimate_facets() model, like Cylinder, Sphere, Circle and
+    # SemiCylinder). fragments follow RadialResolution.get_fragments() with one $fs for
+    # the whole scene, so larger features get more of them. the finest $fs within the
+    # budget is searched for, and every feature gets the resulting fragments as its $fn.
+    # returns an expanded copy of the scene, the scene itself is left alone.
+    Presets = {
+        "preview": {"budget": 20000, "fa": 6.0},
+        "final": {"budget": 250000, "fa": 1.0},
+    }
+    Steps = 60
+
+    def __init__(self, scene, budget="final", fa=None):
+        preset = self.Presets.get(budget) if type(budget) == str else {"budget": budget, "fa": 2.0}
+        if preset == None:
+            raise ValueError, "unknown facet budget preset '%s'" % budget
+        self.scene = scene
+        self.budget = preset["budget"]
+        self.fa = fa or preset["fa"]
+        self.fs = None
+        self.facets = 0
+
+    def schedule(self):
+        self.features = {}
+        ret = self.visit(self.scene, {})
+        if not self.features:
+            return ret
+        counts = {}
+        self.count(ret, counts)
+        features = [(self.features[key], counts[key]) for key in counts]
+        self.fs = self.search(features)
+        self.facets = self.estimate(features, self.fs)
+        resolution = RadialResolution(fs=self.fs, fa=self.fa)
+        for (feature, count) in features:
+            feature.resolution = RadialResolution(fn=resolution.get_fragments(*feature.fragment_args()))
+        msg = "facet budget %d: $fs=%.4g, about %d facets from %d round features" % \
+            (self.budget, self.fs, self.facets, sum([count for (feature, count) in features]))
+        logger.debug(msg)
+        if self.facets > self.budget:
+            msg = "facet budget %d is too small, using the coarsest resolution" % self.budget
+            logger.warn(msg)
+        return ret
+
+    def is_feature(self, obj):
+        return hasattr(obj, "fragment_args") and hasattr(obj, "estimate_facets")
+
+    def visit(self, node, memo):
+        # features are copied before they are expanded, so composites like
+        # SemiCylinder build their points with the scheduled resolution
+        if id(node) in memo:
+            return memo[id(node)][1]
+        if self.is_feature(node):
+            ret = node.copy(stack=False)
+            self.features[id(ret)] = ret
+        else:
+            obj = expand_scad(node)
+            children = [self.visit(child, memo) for child in obj.children]
+            ret = obj
+            if [new for (new, old) in zip(children, obj.children) if new is not old]:
+                ret = obj.copy(descend=False, stack=False)
+                ret.set_children(children)
+        # hold on to the node, so its id can't be recycled during the walk
+        memo[id(node)] = (node, ret)
+        return ret
+
+    def count(self, node, counts):
+        # shared features are emitted, and so paid for, once per occurrence
+        if id(node) in self.features:
+            counts[id(node)] = counts.get(id(node), 0) + 1
+            return
+        for child in node.children:
+            self.count(child, counts)
+
+    def estimate(self, features, fs):
+        resolution = RadialResolution(fs=fs, fa=self.fa)
+        total = 0
+        for (feature, count) in features:
+            fragments = resolution.get_fragments(*feature.fragment_args())
+            total += feature.estimate_facets(fragments) * count
+        return total
+
+    def search(self, features):
+        # bisect $fs on a log scale, between every feature at its fa limit and every
+        # feature at the minimum of 5 fragments
+        lengths = [max(feature.fragment_args()[0], 1e-6) for (feature, count) in features]
+        (lo, hi) = (min(lengths) * self.fa / 720.0, max(lengths))
+        if self.estimate(features, lo) <= self.budget:
+            return lo
+        if self.estimate(features, hi) > self.budget:
+            return hi
+        for step in range(self.Steps):
+            mid = math.sqrt(lo * hi)
+            if self.estimate(features, mid) <= self.budget:
+                hi = mid
+            else:
+                lo = mid
+        return hi
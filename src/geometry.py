@@ -120,6 +120,15 @@ class SemiCylinder(SCAD_Object):
             ret = LinearExtrude(height=self.height)(ret)
         return ret
 
+    # facet model, see FacetBudget
+    def fragment_args(self):
+        return ((self.angle * math.pi * self.radius) / 180.0, self.angle)
+
+    def estimate_facets(self, fragments):
+        if self.height:
+            return fragments + 4
+        return fragments + 2
+
 class Arc(SCAD_Object):
     Defaults = {
         "inner": {"type": SemiCylinder},
@@ -146,7 +155,7 @@ class RoundedCube(SCAD_Object):
         'z': 'size.z',
     }
     Defaults = {
-        "size": {"type": Vector3D, "default": lambda: Vector3D([1.0, 1.0, 1.0])},
+        "size": {"type": FrozenVector3D, "default": FrozenVector3D([1.0, 1.0, 1.0])},
         "radius": {"type": float, "default": 1.0},
         "resolution": {"type": RadialResolution, "default": lambda: RadialResolution(), "propagate": True},
     }
@@ -225,8 +234,7 @@ class Tetrahedron(SCAD_Object):
             [self.edge / 2.0, self.triangle_height / 3.0, self.height],
         ])
         if self.center:
-            tv = Vector3D([self.edge / 2.0, self.triangle_height / 3.0, self.height / 2.0])
-            points = [vv - tv for vv in points]
+            points = points.translate([-self.edge / 2.0, -self.triangle_height / 3.0, -self.height / 2.0])
         return points
 
     @property
@@ -0,0 +1,75 @@
+import math
+
+__all__ = [
+    "translation_matrix",
+    "scale_matrix",
+    "rotation_matrix",
+    "matrix_multiply",
+]
+
+# matrices are 4x4 tuples of float rows, like Multmatrix.matrix. for matrices this
+# small plain python is cheaper than the numpy call overhead.
+IdentityMatrix = ((1.0, 0.0, 0.0, 0.0), (0.0, 1.0, 0.0, 0.0), (0.0, 0.0, 1.0, 0.0), (0.0, 0.0, 0.0, 1.0))
+
+def cos_deg(angle):
+    # exact for multiples of 90 degrees, like OpenSCAD
+    if angle % 90 == 0:
+        return (1.0, 0.0, -1.0, 0.0)[int(angle // 90) % 4]
+    return math.cos(math.radians(angle))
+
+def sin_deg(angle):
+    if angle % 90 == 0:
+        return (0.0, 1.0, 0.0, -1.0)[int(angle // 90) % 4]
+    return math.sin(math.radians(angle))
+
+def matrix_multiply(lhs, rhs):
+    cols = zip(*rhs)
+    return tuple([tuple([sum([(a * b) for (a, b) in zip(row, col)]) for col in cols]) for row in lhs])
+
+def linear_matrix(rows):
+    # a 3x3 linear transform as a 4x4 matrix
+    return tuple([tuple(row) + (0.0,) for row in rows]) + (IdentityMatrix[3],)
+
+def translation_matrix(vector):
+    (x, y, z) = map(float, vector)
+    return ((1.0, 0.0, 0.0, x), (0.0, 1.0, 0.0, y), (0.0, 0.0, 1.0, z), IdentityMatrix[3])
+
+def scale_matrix(vector):
+    (x, y, z) = map(float, vector)
+    return linear_matrix(((x, 0.0, 0.0), (0.0, y, 0.0), (0.0, 0.0, z)))
+
+def rotation_matrix(angle, vector=None):
+    # same rules as OpenSCAD's rotate(a, v): a vector of angles rotates around x, then y,
+    # then z and ignores v, a single angle rotates around v (or z)
+    if type(angle) in (int, long, float):
+        if vector == None:
+            angle = (0.0, 0.0, angle)
+        else:
+            return axis_rotation_matrix(angle, vector)
+    (ax, ay, az) = map(float, angle)
+    rx = linear_matrix(((1.0, 0.0, 0.0), (0.0, cos_deg(ax), -sin_deg(ax)), (0.0, sin_deg(ax), cos_deg(ax))))
+    ry = linear_matrix(((cos_deg(ay), 0.0, sin_deg(ay)), (0.0, 1.0, 0.0), (-sin_deg(ay), 0.0, cos_deg(ay))))
+    rz = linear_matrix(((cos_deg(az), -sin_deg(az), 0.0), (sin_deg(az), cos_deg(az), 0.0), (0.0, 0.0, 1.0)))
+    return matrix_multiply(rz, matrix_multiply(ry, rx))
+
+def axis_rotation_matrix(angle, vector):
+    length = math.sqrt(sum([(val * val) for val in vector]))
+    if not length:
+        return IdentityMatrix
+    (x, y, z) = [(val / length) for val in vector]
+    (c, s) = (cos_deg(angle), sin_deg(angle))
+    t = 1.0 - c
+    return linear_matrix((
+        (c + x * x * t, x * y * t - z * s, x * z * t + y * s),
+        (y * x * t + z * s, c + y * y * t, y * z * t - x * s),
+        (z * x * t - y * s, z * y * t + x * s, c + z * z * t)))
+
+def determinant(matrix):
+    # of the linear part, negative if the transform mirrors
+    ((a, b, c), (d, e, f), (g, h, i)) = [row[:3] for row in matrix[:3]]
+    return a * (e * i - f * h) - b * (d * i - f * g) + c * (d * h - e * g)
+
+def apply_matrix(matrix, point):
+    # transforms a single 3D point
+    point = tuple(point) + (1.0,)
+    return tuple([sum([(m * v) for (m, v) in zip(row, point)]) for row in matrix[:3]])
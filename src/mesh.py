@@ -0,0 +1,104 @@
+import struct
+import logging
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "Mesh",
+]
+
+class Mesh(object):
+    # a triangle soup as read from, and written to, STL files
+    def __init__(self, facets=None, name="OpenSCAD_Model"):
+        # each facet is (normal, (v1, v2, v3)) with 3-tuples of floats
+        self.facets = facets if facets != None else []
+        self.name = name
+
+    def __len__(self):
+        return len(self.facets)
+
+    @classmethod
+    def read(cls, fn):
+        with open(fn, 'rb') as fh:
+            data = fh.read()
+        if cls.is_ascii(data):
+            return cls.parse_ascii(data)
+        return cls.parse_binary(data)
+
+    @classmethod
+    def is_ascii(cls, data):
+        if not data.lstrip().startswith("solid"):
+            return False
+        # binary files may start with 'solid' as well, check the facet count
+        if len(data) >= 84:
+            (count,) = struct.unpack("<I", data[80:84])
+            if len(data) == 84 + count * 50:
+                return False
+        return True
+
+    @classmethod
+    def parse_ascii(cls, data):
+        facets = []
+        name = "OpenSCAD_Model"
+        (normal, vertices) = (None, [])
+        for line in data.splitlines():
+            tokens = line.split()
+            if not tokens:
+                continue
+            if tokens[0] == "solid" and len(tokens) > 1:
+                name = tokens[1]
+            elif tokens[0] == "facet":
+                normal = tuple(map(float, tokens[2:5]))
+                vertices = []
+            elif tokens[0] == "vertex":
+                vertices.append(tuple(map(float, tokens[1:4])))
+            elif tokens[0] == "endfacet":
+                facets.append((normal, tuple(vertices)))
+        return cls(facets, name)
+
+    @classmethod
+    def parse_binary(cls, data):
+        (count,) = struct.unpack("<I", data[80:84])
+        facets = []
+        for idx in xrange(count):
+            offset = 84 + idx * 50
+            values = struct.unpack("<12f", data[offset:offset + 48])
+            facets.append((values[0:3], (values[3:6], values[6:9], values[9:12])))
+        return cls(facets)
+
+    def write(self, fn):
+        with open(fn, 'w') as fh:
+            fh.write("solid %s\n" % self.name)
+            for (normal, vertices) in self.facets:
+                fh.write("  facet normal %r %r %r\n    outer loop\n" % tuple(normal))
+                for vertex in vertices:
+                    fh.write("      vertex %r %r %r\n" % tuple(vertex))
+                fh.write("    endloop\n  endfacet\n")
+            fh.write("endsolid %s\n" % self.name)
+
+    def extend(self, other):
+        self.facets.extend(other.facets)
+
+    def bounds(self):
+        # ((min_x, min_y, min_z), (max_x, max_y, max_z)), or None if there are no facets
+        if not self.facets:
+            return None
+        vertices = [vertex for (normal, verts) in self.facets for vertex in verts]
+        lower = tuple([min(axis) for axis in zip(*vertices)])
+        upper = tuple([max(axis) for axis in zip(*vertices)])
+        return (lower, upper)
+
+    @staticmethod
+    def overlapping(bounds):
+        # indices of the first pair of boxes that touch or overlap, using a sweep along x
+        order = sorted([idx for idx in range(len(bounds)) if bounds[idx] != None], key=lambda idx: bounds[idx][0][0])
+        active = []
+        for idx in order:
+            (lower, upper) = bounds[idx]
+            active = [other for other in active if bounds[other][1][0] >= lower[0]]
+            for other in active:
+                (olower, oupper) = bounds[other]
+                if all([(lower[axis] <= oupper[axis]) and (olower[axis] <= upper[axis]) for axis in range(3)]):
+                    return (other, idx)
+            active.append(idx)
+        return None
@@ -1,8 +1,12 @@
 from color import *
 from core import *
 from vector import *
+from vector import is_point_array, cast_points
+from matrix import IdentityMatrix, translation_matrix, scale_matrix, rotation_matrix
+from bbox import BoundingBox
 import logging
 import inspect
+import math
 import sys
 
 logger = logging.getLogger(__name__)
@@ -14,10 +18,20 @@ class SCAD_Globals(SCAD_Primitive):
         "resolution": {"type": RadialResolution, "default": lambda: RadialResolution(), "propagate": True},
     }
 
-    def render_scad(self, *args, **kw):
-        scad =  "$fn = %d;\n" % self.resolution.fn
-        scad += str.join('\n', [child.render_scad(*args, **kw) for child in self.children])
-        return scad
+    def iter_prelude(self):
+        yield "$fn = %d;\n" % self.resolution.fn
+
+    def iter_scad(self, margin=4, level=0):
+        for chunk in self.iter_prelude():
+            yield chunk
+        for (idx, child) in enumerate(self.children):
+            if idx:
+                yield '\n'
+            for chunk in child.scad_chunks(margin, level):
+                yield chunk
+
+    def get_bbox(self):
+        return self.children_bbox()
 
 class Color(SCAD_Primitive):
     SCAD_Name = "color"
@@ -44,6 +58,9 @@ class Color(SCAD_Primitive):
     def get_scad_args(self):
         rgba = map(str, [[float(self.red) / 0xff, float(self.green) / 0xff, float(self.blue) / 0xff], self.alpha])
         return rgba
+
+    def get_bbox(self):
+        return self.children_bbox()
     
 class Projection(SCAD_Primitive):
     SCAD_Name = "projection"
@@ -54,24 +71,58 @@ class Projection(SCAD_Primitive):
     def get_scad_args(self):
         return [("cut", self.cut)]
 
+    def get_bbox(self):
+        return self.children_bbox().flatten()
+
 class Union(SCAD_Primitive):
     SCAD_Name = "union"
 
+    def get_bbox(self):
+        return self.children_bbox()
+
 class Difference(SCAD_Primitive):
     SCAD_Name = "difference"
 
+    def get_bbox(self):
+        # no larger than what is subtracted from
+        if not self.children:
+            return BoundingBox.empty()
+        return self.children[0].bbox()
+
 class Intersection(SCAD_Primitive):
     SCAD_Name = "intersection"
 
+    def get_bbox(self):
+        if not self.children:
+            return BoundingBox.empty()
+        ret = BoundingBox.unbounded()
+        for child in self.children:
+            ret = ret.intersection(child.bbox())
+        return ret
+
 class Minkowski(SCAD_Primitive):
     SCAD_Name = "minkowski"
 
+    def get_bbox(self):
+        if not self.children:
+            return BoundingBox.empty()
+        ret = self.children[0].bbox()
+        for child in self.children[1:]:
+            ret = ret.minkowski(child.bbox())
+        return ret
+
 class Hull(SCAD_Primitive):
     SCAD_Name = "hull"
 
+    def get_bbox(self):
+        return self.children_bbox()
+
 class Render(SCAD_Primitive):
     SCAD_Name = "render"
 
+    def get_bbox(self):
+        return self.children_bbox()
+
 class Rotate(SCAD_Primitive):
     SCAD_Name = "rotate"
     Aliases = {
@@ -86,8 +137,8 @@ class Rotate(SCAD_Primitive):
     }
     Defaults = {
         "deg_a": {"type": float, "default": None},
-        "vector": {"type": Vector3D, "default": None},
-        "angle": {"type": Vector3D, "default": lambda: Vector3D([0.0, 0.0, 0.0])},
+        "vector": {"type": FrozenVector3D, "default": None},
+        "angle": {"type": FrozenVector3D, "default": FrozenVector3D([0.0, 0.0, 0.0])},
     }
 
     def __init__(self, *args, **kw):
@@ -113,37 +164,109 @@ class Rotate(SCAD_Primitive):
             args.append(arg)
         return args
 
+    def get_matrix(self):
+        return rotation_matrix(self.deg_a if self.deg_a != None else self.angle, self.vector)
+
+    def get_bbox(self):
+        return self.children_bbox().transform(self.get_matrix())
+
 class Scale(Vector3D_SCAD_Primitive):
     SCAD_Name = "scale"
 
+    def get_matrix(self):
+        return scale_matrix(self.vector)
+
+    def get_bbox(self):
+        return self.children_bbox().transform(self.get_matrix())
+
 class Translate(Vector3D_SCAD_Primitive):
     SCAD_Name = "translate"
 
+    def get_matrix(self):
+        return translation_matrix(self.vector)
+
+    def get_bbox(self):
+        return self.children_bbox().translate(self.vector)
+
+def cast_matrix(matrix):
+    # a 4x4 (or 3x4, the last row is implied) affine matrix as a tuple of float rows
+    rows = [tuple(map(float, row)) for row in matrix]
+    if len(rows) == 3:
+        rows.append(IdentityMatrix[3])
+    if len(rows) != 4 or [row for row in rows if len(row) != 4]:
+        raise ValueError, "multmatrix needs a 4x4 or 3x4 matrix"
+    return tuple(rows)
+
+class Multmatrix(SCAD_Primitive):
+    SCAD_Name = "multmatrix"
+    Aliases = {
+        'm': 'matrix',
+    }
+    Defaults = {
+        "matrix": {"type": tuple, "cast": cast_matrix, "default": IdentityMatrix},
+    }
+
+    def __init__(self, args=(), **kw):
+        if len(args):
+            kw["matrix"] = args
+        super(Multmatrix, self).__init__(**kw)
+
+    def get_scad_args(self):
+        return [("m", [list(row) for row in self.matrix])]
+
+    def get_matrix(self):
+        return self.matrix
+
+    def get_bbox(self):
+        return self.children_bbox().transform(self.matrix)
+
+def point_list(points):
+    if is_point_array(points):
+        return points.tolist()
+    return [list(i) for i in points]
+
 class Polyhedron(Vector3D_SCAD_Primitive):
     SCAD_Name = "polyhedron"
+    # points and faces may also be numpy arrays, which are kept as they are
     Defaults = {
-        "points": {"type": ListVector3D},
-        "faces": {"type": ListVector3D},
+        "points": {"type": ListVector3D, "cast": cast_points(ListVector3D)},
+        "faces": {"type": ListVector3D, "cast": cast_points(ListVector3D)},
         "convexity": {"type": int, "default": None},
     }
     def get_scad_args(self):
-        pts = [list(i) for i in self.points]
-        faces = [list(i) for i in self.faces]
+        pts = point_list(self.points)
+        faces = point_list(self.faces)
         args = [("points", pts), ("faces", faces)]
         if self.convexity != None:
             args.append(("convexity", self.convexity))
         return args
 
+    def iter_args(self):
+        yield "points="
+        for chunk in self.iter_list(self.points):
+            yield chunk
+        yield ", faces="
+        for chunk in self.iter_list(self.faces):
+            yield chunk
+        if self.convexity != None:
+            yield ", convexity=%s" % self.convexity
+
+    def get_bbox(self):
+        return BoundingBox.from_points(self.points)
+
 class Polygon(Vector3D_SCAD_Primitive):
     SCAD_Name = "polygon"
     Defaults = {
-        "points": {"type": ListVector2D},
+        "points": {"type": ListVector2D, "cast": cast_points(ListVector2D)},
         "paths": {"type": list},
         "convexity": {"type": int, "default": None},
     }
     def get_scad_args(self):
-        pts = [list(i) for i in self.points]
-        args = [("points", pts)]
+        pts = point_list(self.points)
+        return [("points", pts)] + self.get_path_args()
+
+    def get_path_args(self):
+        args = []
         if self.paths:
             # XXX: it would be nice to handle this on a more generic layer
             if type(self.paths[0]) in (list, tuple):
@@ -155,6 +278,18 @@ class Polygon(Vector3D_SCAD_Primitive):
             args.append(("convexity", self.convexity))
         return args
 
+    def iter_args(self):
+        yield "points="
+        for chunk in self.iter_list(self.points):
+            yield chunk
+        args = self.get_path_args()
+        if args:
+            yield ", " + str.join(', ', [self.translate_arg_to_scad(arg) for arg in args])
+
+    def get_bbox(self):
+        # points left out of the paths only make the box larger
+        return BoundingBox.from_points(self.points)
+
 class LinearExtrude(SCAD_Primitive):
     SCAD_Name = "linear_extrude"
     Defaults = {
@@ -175,20 +310,37 @@ class LinearExtrude(SCAD_Primitive):
             args.append(("convexity", self.convexity))
         return args
 
+    def get_bbox(self):
+        base = self.children_bbox().flatten()
+        if base.is_empty:
+            return base
+        (lower, upper) = (base.lower[:2], base.upper[:2])
+        scale = max(1.0, self.scale)
+        if self.twist:
+            # the twisted base stays inside the circle around its corners
+            radius = max([math.hypot(x, y) for (x, y, z) in base.corners()]) * scale
+            (lower, upper) = ((-radius, -radius), (radius, radius))
+        elif self.scale != 1.0:
+            # the top is the base scaled around the origin
+            top = [(val * self.scale) for val in lower + upper]
+            lower = (min(lower[0], top[0]), min(lower[1], top[1]))
+            upper = (max(upper[0], top[2]), max(upper[1], top[3]))
+        z = (-self.height / 2.0, self.height / 2.0) if self.center else (0.0, self.height)
+        return BoundingBox(lower + z[:1], upper + z[1:])
+
 class Include(SCAD_Primitive):
     SCAD_Name = "include"
     Defaults = {
         "filename": {"type": str},
     }
 
-    def render_scad(self, margin=4, level=0):
-        macros = {
-            "filename": self.filename,
-            "margin": ' ' * margin,
-        }
-        scad = "%(margin)sinclude <%(filename)s>;\n%(body)s"
-        macros["body"] = str.join('\n', [child.render_scad(margin, level + 1) for child in self.children])
-        return scad % macros
+    def iter_scad(self, margin=4, level=0):
+        yield "%sinclude <%s>;\n" % (' ' * margin, self.filename)
+        for (idx, child) in enumerate(self.children):
+            if idx:
+                yield '\n'
+            for chunk in child.scad_chunks(margin, level + 1):
+                yield chunk
 
 class Inline(SCAD_Primitive):
     SCAD_Name = "__inline__"
@@ -196,13 +348,8 @@ class Inline(SCAD_Primitive):
         "code": {"type": str},
     }
 
-    def render_scad(self, margin=4, level=0):
-        macros = {
-            "code": self.code,
-            "margin": ' ' * margin,
-        }
-        scad = "%(margin)s%(code)s\n"
-        return scad % macros
+    def iter_scad(self, margin=4, level=0):
+        yield "%s%s\n" % (' ' * margin, self.code)
 
 class Cube(SCAD_Primitive):
     SCAD_Name = "cube"
@@ -212,7 +359,7 @@ class Cube(SCAD_Primitive):
         'z': 'size.z',
     }
     Defaults = {
-        "size": {"type": Vector3D, "default": lambda: Vector3D([1.0, 1.0, 1.0])},
+        "size": {"type": FrozenVector3D, "default": FrozenVector3D([1.0, 1.0, 1.0])},
     }
 
     def __init__(self, args=(), **kw):
@@ -223,13 +370,18 @@ class Cube(SCAD_Primitive):
     def get_scad_args(self):
         return [self.size, ("center", self.center)]
 
+    def get_bbox(self):
+        if self.center:
+            return BoundingBox([-val / 2.0 for val in self.size], [val / 2.0 for val in self.size])
+        return BoundingBox((0.0, 0.0, 0.0), self.size)
+
     def get_size(self):
         return self["size"]
 
     def set_size(self, size):
         if type(size) in (int, float):
             size = [size] * 3
-        self["size"] = Vector3D(size)
+        self["size"] = FrozenVector3D(size)
     size = property(get_size, set_size)
 
 class Cylinder(SCAD_Primitive):
@@ -258,6 +410,20 @@ class Cylinder(SCAD_Primitive):
         scad += self.resolution.get_scad_args()
         return scad
 
+    def get_bbox(self):
+        # the facets lie inside the circles
+        r = max(self.radius_1, self.radius_2) if self.r2 else self.radius_1
+        z = (-self.height / 2.0, self.height / 2.0) if self.center else (0.0, self.height)
+        return BoundingBox((-r, -r, z[0]), (r, r, z[1]))
+
+    # facet model, see FacetBudget
+    def fragment_args(self):
+        r = max(self.radius_1, self.radius_2) if self.r2 else self.radius_1
+        return (2 * math.pi * r, 360)
+
+    def estimate_facets(self, fragments):
+        return fragments + 2
+
     def get_diamater(self):
         return self.radius * 2
     def set_diamater(self, dia):
@@ -289,6 +455,17 @@ class Sphere(SCAD_Primitive):
         scad += self.resolution.get_scad_args()
         return scad
 
+    def get_bbox(self):
+        r = self.radius
+        return BoundingBox((-r, -r, -r), (r, r, r))
+
+    def fragment_args(self):
+        return (2 * math.pi * self.radius, 360)
+
+    def estimate_facets(self, fragments):
+        # OpenSCAD stacks (fragments + 1) / 2 rings of fragments points
+        return ((fragments + 1) / 2 - 1) * fragments + 2
+
     def get_diamater(self):
         return self.radius * 2
     def set_diamater(self, dia):
@@ -313,6 +490,17 @@ class Circle(SCAD_Primitive):
         scad += self.resolution.get_scad_args()
         return scad
 
+    def get_bbox(self):
+        r = self.radius
+        return BoundingBox((-r, -r, 0.0), (r, r, 0.0))
+
+    def fragment_args(self):
+        return (2 * math.pi * self.radius, 360)
+
+    def estimate_facets(self, fragments):
+        # the edges, each one becomes a facet once extruded
+        return fragments
+
     def get_diamater(self):
         return self.radius * 2
     def set_diamater(self, dia):
@@ -0,0 +1,173 @@
+import json
+import base64
+import logging
+from base import BaseObject
+from vector import FrozenVector, ListVector, ArrayListVector
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "dump_scene",
+    "dumps_scene",
+    "load_scene",
+    "loads_scene",
+]
+
+# JSON scene format:
+#
+#   {"format": "pyscad-scene", "version": 1, "root": 0, "nodes": [...]}
+#
+# every BaseObject, whether a child or a value held in a namespace (like a
+# resolution), is stored once in "nodes" as {"class", "name", "ns", "children"}
+# and referred to by its index, so shared subtrees stay shared. values that
+# JSON can't hold are tagged: {"$node": idx}, {"$tuple": [...]}, {"$dict": [[k, v], ...]},
+# {"$seq": "module.Class", "items": [...]} for vector lists and frozen vectors and
+# {"$array": dtype, "shape": [...], "data": base64}. anything else can't be saved.
+#
+# loading never imports modules or unpickles anything: "class" has to name a node class
+# that is already defined, "$seq" a vector class. nodes are created without running
+# their __init__, so a file can only describe a scene, not run code.
+
+Format = "pyscad-scene"
+Version = 1
+
+def class_path(cls):
+    return "%s.%s" % (cls.__module__, cls.__name__)
+
+def allowed_classes(*bases):
+    # the defined subclasses of bases, by class path
+    ret = {}
+    todo = list(bases)
+    while todo:
+        cls = todo.pop()
+        ret[class_path(cls)] = cls
+        todo.extend(cls.__subclasses__())
+    return ret
+
+def node_classes():
+    return allowed_classes(BaseObject)
+
+def sequence_classes():
+    return allowed_classes(FrozenVector, ListVector, ArrayListVector)
+
+def find_class(path, classes):
+    if type(path) not in (str, unicode) or path not in classes:
+        raise ValueError, "'%s' is not a scene class" % (path,)
+    return classes[path]
+
+class SceneEncoder(object):
+    def __init__(self):
+        self.index = {}
+        self.nodes = []
+        self.sequences = sequence_classes()
+
+    def node(self, obj):
+        idx = self.index.get(id(obj))
+        if idx != None:
+            return idx
+        idx = len(self.nodes)
+        self.index[id(obj)] = idx
+        entry = {"class": class_path(obj.__class__), "name": obj.name}
+        self.nodes.append(entry)
+        namespace = obj.namespace
+        entry["ns"] = {key: self.value(namespace[key]) for key in namespace}
+        entry["children"] = [self.node(child) for child in obj.iter_children()]
+        return idx
+
+    def value(self, value):
+        if value is None or type(value) in (bool, int, long, float, str, unicode):
+            return value
+        if isinstance(value, BaseObject):
+            return {"$node": self.node(value)}
+        if type(value) == list:
+            return [self.value(item) for item in value]
+        if type(value) == tuple:
+            return {"$tuple": [self.value(item) for item in value]}
+        if type(value) == dict:
+            return {"$dict": [[self.value(key), self.value(val)] for (key, val) in value.items()]}
+        if numpy != None and isinstance(value, numpy.ndarray):
+            data = numpy.ascontiguousarray(value)
+            return {"$array": data.dtype.str, "shape": list(data.shape), "data": base64.b64encode(data.tobytes())}
+        if class_path(value.__class__) in self.sequences:
+            if hasattr(value, "VectorType"):
+                # lists of vectors are rebuilt from plain coordinates
+                return {"$seq": class_path(value.__class__), "items": [list(item) for item in value]}
+            return {"$seq": class_path(value.__class__), "items": [self.value(item) for item in value]}
+        raise TypeError, "can't save a %s in a scene" % type(value).__name__
+
+    def encode(self, scene):
+        root = self.node(scene)
+        return {"format": Format, "version": Version, "root": root, "nodes": self.nodes}
+
+class SceneDecoder(object):
+    def __init__(self, content):
+        if content.get("format") != Format or content.get("version") != Version:
+            raise ValueError, "not a version %d %s" % (Version, Format)
+        self.content = content
+        self.objects = []
+        self.sequences = sequence_classes()
+
+    def value(self, value):
+        if type(value) == list:
+            return [self.value(item) for item in value]
+        if type(value) != dict:
+            if type(value) == unicode:
+                try:
+                    return str(value)
+                except UnicodeEncodeError:
+                    pass
+            return value
+        if "$node" in value:
+            return self.objects[value["$node"]]
+        if "$tuple" in value:
+            return tuple([self.value(item) for item in value["$tuple"]])
+        if "$dict" in value:
+            return {self.value(key): self.value(val) for (key, val) in value["$dict"]}
+        if "$array" in value:
+            if numpy == None:
+                raise RuntimeError, "loading arrays requires numpy"
+            dtype = numpy.dtype(str(value["$array"]))
+            if dtype.hasobject:
+                raise ValueError, "arrays of objects can't be loaded"
+            data = numpy.frombuffer(base64.b64decode(value["data"]), dtype=dtype)
+            return data.reshape(value["shape"]).copy()
+        if "$seq" in value:
+            return find_class(value["$seq"], self.sequences)([self.value(item) for item in value["items"]])
+        raise ValueError, "unknown value %r" % value
+
+    def decode(self):
+        nodes = self.content["nodes"]
+        classes = node_classes()
+        # create every object first, so references can point anywhere
+        for entry in nodes:
+            cls = find_class(entry["class"], classes)
+            self.objects.append(cls.__new__(cls))
+        for (obj, entry) in zip(self.objects, nodes):
+            namespace = {str(key): self.value(val) for (key, val) in entry["ns"].items()}
+            children = [self.objects[idx] for idx in entry["children"]]
+            name = entry["name"]
+            obj.__setstate__((str(name) if name != None else None, namespace, children, []))
+        return self.objects[self.content["root"]]
+
+def dumps_scene(scene):
+    return json.dumps(SceneEncoder().encode(scene), sort_keys=True, separators=(',', ':'))
+
+def loads_scene(text):
+    return SceneDecoder(json.loads(text)).decode()
+
+def dump_scene(scene, fn):
+    msg = "saving scene to %s" % fn
+    logger.info(msg)
+    with open(fn, 'w') as fh:
+        fh.write(dumps_scene(scene))
+
+def load_scene(fn):
+    msg = "loading scene from %s" % fn
+    logger.info(msg)
+    with open(fn) as fh:
+        return loads_scene(fh.read())
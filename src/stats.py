@@ -0,0 +1,84 @@
+import re
+import logging
+from utils import save_json
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "RenderStats",
+]
+
+class RenderStats(object):
+    # what OpenSCAD reports about a render, parsed from its console output
+    Counters = {
+        "vertices": re.compile(r"^\s*Vertices:\s*(\d+)"),
+        "halfedges": re.compile(r"^\s*Halfedges:\s*(\d+)"),
+        "edges": re.compile(r"^\s*Edges:\s*(\d+)"),
+        "halffacets": re.compile(r"^\s*Halffacets:\s*(\d+)"),
+        "facets": re.compile(r"^\s*Facets:\s*(\d+)"),
+        "volumes": re.compile(r"^\s*Volumes:\s*(\d+)"),
+        "contours": re.compile(r"^\s*Contours:\s*(\d+)"),
+        "geometry_cache_entries": re.compile(r"^\s*Geometries in cache:\s*(\d+)"),
+        "geometry_cache_bytes": re.compile(r"^\s*Geometry cache size in bytes:\s*(\d+)"),
+        "cgal_cache_entries": re.compile(r"^\s*CGAL Polyhedrons in cache:\s*(\d+)"),
+        "cgal_cache_bytes": re.compile(r"^\s*CGAL cache size in bytes:\s*(\d+)"),
+        "csg_elements": re.compile(r"^\s*Normalized CSG tree has (\d+) elements"),
+    }
+    # "0 hours, 0 minutes, 12 seconds" or "0:00:12.345"
+    TimeRE = re.compile(r"^\s*Total rendering time:\s*(?:(\d+) hours?, (\d+) minutes?, ([\d.]+) seconds?|(\d+):(\d+):([\d.]+))")
+    ObjectRE = re.compile(r"^\s*Top level object is a (\d)D object")
+    SimpleRE = re.compile(r"^\s*Simple:\s*(\w+)")
+
+    def __init__(self, wall_time=None):
+        self.wall_time = wall_time
+        self.cgal_time = None
+        self.dimensions = None
+        self.simple = None
+        self.warnings = []
+        self.errors = []
+        for key in self.Counters:
+            setattr(self, key, None)
+
+    def __repr__(self):
+        return "RenderStats(wall_time=%r, cgal_time=%r, facets=%r, volumes=%r, warnings=%d)" % \
+            (self.wall_time, self.cgal_time, self.facets, self.volumes, len(self.warnings))
+
+    @classmethod
+    def parse(cls, text, wall_time=None):
+        stats = cls(wall_time)
+        for line in text.splitlines():
+            stats.parse_line(line)
+        return stats
+
+    def parse_line(self, line):
+        if line.startswith("WARNING:") or line.startswith("DEPRECATED:"):
+            self.warnings.append(line.split(':', 1)[-1].strip())
+            return
+        if line.startswith("ERROR:"):
+            self.errors.append(line.split(':', 1)[-1].strip())
+            return
+        m = self.TimeRE.match(line)
+        if m:
+            (hours, minutes, seconds) = [val for val in m.groups() if val != None]
+            self.cgal_time = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+            return
+        m = self.ObjectRE.match(line)
+        if m:
+            self.dimensions = int(m.group(1))
+            return
+        m = self.SimpleRE.match(line)
+        if m:
+            self.simple = (m.group(1) == "yes")
+            return
+        for (key, regex) in self.Counters.items():
+            m = regex.match(line)
+            if m:
+                setattr(self, key, int(m.group(1)))
+                return
+
+    def to_dict(self):
+        keys = ["wall_time", "cgal_time", "dimensions", "simple", "warnings", "errors"] + self.Counters.keys()
+        return {key: getattr(self, key) for key in keys}
+
+    def save(self, json_fn):
+        save_json(self.to_dict(), json_fn, lazy=False)
@@ -66,7 +66,7 @@ class Glyph(SCAD_Object):
         return self.face.glyph.outline
     
     @property
-    def bbox(self):
+    def outline_bbox(self):
         return self.outline.get_bbox()
 
     def process_contours(self):
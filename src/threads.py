@@ -3,6 +3,11 @@ from . core import *
 from . color import *
 from . primitives import *
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 __all__ = [
     "Threads",
 ]
@@ -185,6 +190,9 @@ class Threads(SCAD_Object):
                         face = (idx + offset - 1, idx + offset, bottom_idx)
                         #self.snap_face(points, face, 0)
                         faces.append(face)
+        if numpy != None:
+            # large meshes are handed to Polyhedron as arrays
+            (points, faces) = (numpy.array(points, dtype=float), numpy.array(faces, dtype=int))
         return Polyhedron(points=points, faces=faces)
 
     def scad_debug(self, helix_list):
@@ -0,0 +1,119 @@
+import logging
+from core import expand_scad, is_structural
+from vector import ListVector2D, ListVector3D, is_point_array
+from primitives import Multmatrix, point_list
+from matrix import IdentityMatrix, matrix_multiply, determinant
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "TransformFolder",
+    "transform_matrix",
+]
+
+def transform_matrix(obj):
+    # the matrix of a translate, rotate, scale or multmatrix primitive
+    if not hasattr(obj, "get_matrix"):
+        raise ValueError, "%s is not a transform" % obj.SCAD_Name
+    return obj.get_matrix()
+
+def transform_points(points, matrix, dims):
+    # applies the affine matrix to an (N, dims) point list
+    rows = [(row[:dims] + (row[3],)) for row in matrix[:dims]]
+    if numpy != None:
+        arr = points if is_point_array(points) else numpy.asarray(point_list(points), dtype=float)
+        rows = numpy.array(rows)
+        return arr.dot(rows[:, :dims].T) + rows[:, dims]
+    list_type = ListVector3D if dims == 3 else ListVector2D
+    if not isinstance(points, list_type):
+        points = list_type(points)
+    return points.transform(rows)
+
+class TransformFolder(object):
+    # replaces chains of translate, rotate, scale and multmatrix nodes by a single
+    # multmatrix. with bake set, transforms of polyhedrons and polygons are applied
+    # to their points instead. like CSGOptimizer, the scene itself is left alone.
+    Transforms = ("translate", "rotate", "scale", "multmatrix")
+
+    def __init__(self, scene, bake=False):
+        self.scene = scene
+        self.bake = bake
+        self.removed = 0
+
+    def fold(self):
+        self.removed = 0
+        ret = self.visit(self.scene, {})
+        msg = "transform folding removed %d nodes" % self.removed
+        logger.debug(msg)
+        return ret
+
+    def is_transform(self, obj):
+        return is_structural(obj) and obj.SCAD_Name in self.Transforms and \
+            not obj.scad_modifier and len(obj.children) == 1
+
+    def visit(self, node, memo):
+        if id(node) in memo:
+            return memo[id(node)][1]
+        obj = expand_scad(node)
+        if self.is_transform(obj):
+            ret = self.fold_chain(obj, memo)
+        else:
+            ret = self.replace_children(obj, [self.visit(child, memo) for child in obj.children])
+        # hold on to the node, so its id can't be recycled during the walk
+        memo[id(node)] = (node, ret)
+        return ret
+
+    def replace_children(self, obj, children):
+        if not [new for (new, old) in zip(children, obj.children) if new is not old]:
+            return obj
+        ret = obj.copy(descend=False, stack=False)
+        ret.set_children(children)
+        return ret
+
+    def fold_chain(self, obj, memo):
+        # parents apply after their children, so the matrices multiply top down
+        matrix = transform_matrix(obj)
+        count = 1
+        child = expand_scad(obj.children[0])
+        while self.is_transform(child):
+            matrix = matrix_multiply(matrix, transform_matrix(child))
+            count += 1
+            child = expand_scad(child.children[0])
+        target = self.visit(child, memo)
+        if self.bake and self.can_bake(target, matrix):
+            self.removed += count
+            return self.bake_points(target, matrix)
+        if count == 1:
+            return self.replace_children(obj, [target])
+        self.removed += count - 1
+        return Multmatrix(matrix)(target)
+
+    def can_bake(self, obj, matrix):
+        if not is_structural(obj) or obj.children:
+            return False
+        if obj.SCAD_Name == "polyhedron":
+            return True
+        if obj.SCAD_Name == "polygon":
+            # only transforms that stay in the xy plane
+            return matrix[2] == IdentityMatrix[2] and matrix[0][2] == 0 and matrix[1][2] == 0
+        return False
+
+    def bake_points(self, obj, matrix):
+        ret = obj.copy(descend=False, stack=False)
+        if obj.SCAD_Name == "polygon":
+            ret.points = transform_points(obj.points, matrix, 2)
+            return ret
+        ret.points = transform_points(obj.points, matrix, 3)
+        if determinant(matrix) < 0:
+            # mirrored, the faces have to be wound the other way
+            faces = obj.faces
+            if is_point_array(faces):
+                ret.faces = faces[:, ::-1].copy()
+            else:
+                ret.faces = [list(reversed(list(face))) for face in faces]
+        return ret
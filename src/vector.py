@@ -1,14 +1,27 @@
 import math
+import array
 import operator
 import itertools
 from base import BaseObject, BaseObjectMetaclass, SCAD_BaseObjectMetaclass
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 __all__ = [
     "Vector2D",
     "ListVector2D",
     "Vector3D",
     "ListVector3D",
     "BaseVector",
+    "ListVector",
+    "ArrayListVector",
+    "ArrayListVector2D",
+    "ArrayListVector3D",
+    "FrozenVector",
+    "FrozenVector2D",
+    "FrozenVector3D",
 ]
 
 class BaseVectorMetaClass(SCAD_BaseObjectMetaclass):
@@ -26,6 +39,7 @@ class BaseVector(BaseObject):
     Axes = ()
     Defaults = {}
     Aliases = {}
+    AutoName = False
 
     def __init__(self, args=(), **kw):
         kw.update({self.Axes[idx]: val for (idx, val) in enumerate(args)})
@@ -80,6 +94,117 @@ class BaseVector(BaseObject):
     def __delattr__(self, key):
         raise RuntimeError, "operation not supported"
 
+class FrozenVector(tuple):
+    # immutable, slotted vector for the values primitives hold on to, such as
+    # Cube.size or Translate.vector. use replace() to get a modified copy.
+    __slots__ = ()
+    Frozen = True
+    Axes = ()
+    Aliases = {}
+
+    def __new__(cls, args=(), **kw):
+        if type(args) == cls and not kw:
+            return args
+        values = list(args)
+        if len(values) > len(cls.Axes):
+            msg = "%s takes at most %d values, got %d" % (cls.__name__, len(cls.Axes), len(values))
+            raise TypeError, msg
+        values += [0.0] * (len(cls.Axes) - len(values))
+        for (key, val) in kw.items():
+            values[cls.axis_index(key)] = val
+        return tuple.__new__(cls, map(float, values))
+
+    @classmethod
+    def axis_index(cls, key):
+        key = cls.Aliases.get(key, key)
+        if key not in cls.Axes:
+            raise AttributeError, "%s has no axis '%s'" % (cls.__name__, key)
+        return cls.Axes.index(key)
+
+    def __getnewargs__(self):
+        return (tuple(self),)
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, str.join(', ', map(repr, self)))
+
+    def __getitem__(self, key):
+        if type(key) in (str, unicode):
+            key = self.axis_index(key)
+        return tuple.__getitem__(self, key)
+
+    def __getslice__(self, start, stop):
+        return tuple(self)[start:stop]
+
+    def replace(self, **kw):
+        values = list(self)
+        for (key, val) in kw.items():
+            values[self.axis_index(key)] = val
+        return self.__class__(values)
+
+    @property
+    def vector(self):
+        return tuple(self)
+
+    def __add__(self, other):
+        if type(other) in (int, float):
+            return self.__class__([(v1 + other) for v1 in self])
+        return self.__class__([(v1 + v2) for (v1, v2) in zip(self, other)])
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if type(other) in (int, float):
+            return self.__class__([(v1 - other) for v1 in self])
+        return self.__class__([(v1 - v2) for (v1, v2) in zip(self, other)])
+
+    def __neg__(self):
+        return self.__class__([-v1 for v1 in self])
+
+    def __mul__(self, other):
+        return self.scale(other)
+    __rmul__ = __mul__
+
+    def scale(self, other):
+        if type(other) in (int, float):
+            return self.__class__([(v1 * other) for v1 in self])
+        return self.__class__([(v1 * v2) for (v1, v2) in zip(self, other)])
+
+    def dotproduct(self, other):
+        return sum([(v1 * v2) for (v1, v2) in zip(self, other)])
+
+    def norm(self):
+        return math.sqrt(sum([(v1 ** 2) for v1 in self]))
+    magnitude = norm
+
+    def distance(self, other):
+        return math.sqrt(sum([(v1 - v2) ** 2 for (v1, v2) in zip(self, other)]))
+
+class FrozenVector2D(FrozenVector):
+    __slots__ = ()
+    Axes = ('x', 'y')
+    # the same aliases as Vector2D
+    Aliases = {'X': 'x', 'width': 'x', 'w': 'x', 'Y': 'y', 'depth': 'y', 'd': 'y'}
+    x = X = width = w = property(operator.itemgetter(0))
+    y = Y = depth = d = property(operator.itemgetter(1))
+
+    def crossproduct(self, other):
+        # z component of the 3D cross product
+        (x2, y2) = tuple(other)[:2]
+        return self[0] * y2 - self[1] * x2
+
+class FrozenVector3D(FrozenVector):
+    __slots__ = ()
+    Axes = ('x', 'y', 'z')
+    # the same aliases as Vector3D
+    Aliases = {'X': 'x', 'width': 'x', 'w': 'x', 'Y': 'y', 'depth': 'y', 'd': 'y', 'Z': 'z', 'height': 'z', 'h': 'z'}
+    x = X = width = w = property(operator.itemgetter(0))
+    y = Y = depth = d = property(operator.itemgetter(1))
+    z = Z = height = h = property(operator.itemgetter(2))
+
+    def crossproduct(self, other):
+        (x1, y1, z1) = self
+        (x2, y2, z2) = tuple(other)[:3]
+        return self.__class__((y1 * z2 - z1 * y2, z1 * x2 - x1 * z2, x1 * y2 - y1 * x2))
+
 class ListVector(list):
     VectorType = BaseVector
 
@@ -92,23 +217,244 @@ class ListVector(list):
             item = self.VectorType(item)
         return item
 
-    def __setitem__(self, item):
-        super(ListVector, self).__setitem__(self.cast(item))
+    def __setitem__(self, index, item):
+        if isinstance(index, slice):
+            item = [self.cast(i) for i in item]
+        else:
+            item = self.cast(item)
+        super(ListVector, self).__setitem__(index, item)
+
+    def __setslice__(self, start, stop, items):
+        self.__setitem__(slice(start, stop), items)
 
     def append(self, item):
         super(ListVector, self).append(self.cast(item))
 
     def extend(self, items):
-        super(ListVector, self).extend([self.cast(i) for i in args])
+        super(ListVector, self).extend([self.cast(i) for i in items])
 
     def insert(self, index, item):
         super(ListVector, self).insert(index, self.cast(item))
 
+    # bulk operations, these return a new list
+    def translate(self, offset):
+        if type(offset) in (int, float):
+            offset = [offset] * len(self.VectorType.Axes)
+        offset = list(offset)
+        return self.__class__([[(v1 + v2) for (v1, v2) in zip(item, offset)] for item in self])
+
+    def scale(self, factor):
+        if type(factor) in (int, float):
+            factor = [factor] * len(self.VectorType.Axes)
+        factor = list(factor)
+        return self.__class__([[(v1 * v2) for (v1, v2) in zip(item, factor)] for item in self])
+
+    def transform(self, matrix):
+        # matrix is either a (dims x dims) linear or a (dims + 1 x dims + 1) affine transform
+        dims = len(self.VectorType.Axes)
+        rows = [list(row) for row in matrix][:dims]
+        ret = []
+        for item in self:
+            item = list(item)
+            ret.append([sum([(m * v) for (m, v) in zip(row, item)]) + (row[dims] if len(row) > dims else 0) for row in rows])
+        return self.__class__(ret)
+
+    def bounds(self):
+        # (minimum, maximum) corner vectors, or None for an empty list
+        if not len(self):
+            return None
+        axes = zip(*[list(item) for item in self])
+        return (self.VectorType(map(min, axes)), self.VectorType(map(max, axes)))
+
     @classmethod
     def factory(cls, vector_type, name=None):
         name = name or "List" + vector_type.__name__
         return type(name, (cls,), {"VectorType": vector_type})
 
+class ArrayListVector(object):
+    # list of vectors stored contiguously in a numpy array (requires numpy).
+    # items are handed out as VectorType objects, bulk operations are vectorized.
+    VectorType = BaseVector
+
+    def __init__(self, iterable=()):
+        if numpy == None:
+            raise RuntimeError, "%s requires numpy" % self.__class__.__name__
+        dims = len(self.VectorType.Axes)
+        arr = point_array(iterable, dims)
+        if arr is None:
+            try:
+                arr = numpy.array(iterable, dtype=float)
+            except (TypeError, ValueError):
+                arr = None
+            if arr is None or arr.ndim != 2:
+                arr = numpy.array([list(self.cast(item)) for item in iterable], dtype=float)
+        self._data = numpy.array(arr, dtype=float).reshape(-1, dims)
+        self._size = len(self._data)
+
+    @classmethod
+    def view(cls, arr):
+        # wrap an existing (N, dims) array without copying it
+        obj = cls.__new__(cls)
+        obj._data = arr
+        obj._size = len(arr)
+        return obj
+
+    @property
+    def array(self):
+        return self._data[:self._size]
+
+    def __array__(self, dtype=None):
+        if dtype == None:
+            return self.array
+        return self.array.astype(dtype)
+
+    def cast(self, item):
+        if not isinstance(item, self.VectorType):
+            item = self.VectorType(item)
+        return item
+
+    def row(self, item):
+        if isinstance(item, BaseVector):
+            item = list(item)
+        return numpy.asarray(item, dtype=float)
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, self.tolist())
+
+    def tolist(self):
+        return self.array.tolist()
+
+    # list interface
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for row in self.array.tolist():
+            yield self.VectorType(row)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.view(self.array[index])
+        return self.VectorType(self.array[index].tolist())
+
+    def __setitem__(self, index, item):
+        if isinstance(index, slice):
+            self.array[index] = self.__class__(item).array
+        else:
+            self.array[index] = self.row(item)
+
+    def __delitem__(self, index):
+        self._data = numpy.delete(self.array, index, axis=0)
+        self._size = len(self._data)
+
+    def __eq__(self, other):
+        if not hasattr(other, "__len__") or len(self) != len(other):
+            return False
+        return bool(numpy.all(self.array == numpy.asarray([list(item) for item in other], dtype=float)))
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def reserve(self, size):
+        if size <= len(self._data):
+            return
+        data = numpy.empty((max(size, 2 * len(self._data)), self._data.shape[1]), dtype=float)
+        data[:self._size] = self.array
+        self._data = data
+
+    def append(self, item):
+        self.reserve(self._size + 1)
+        self._data[self._size] = self.row(item)
+        self._size += 1
+
+    def extend(self, items):
+        items = self.__class__(items).array
+        self.reserve(self._size + len(items))
+        self._data[self._size:self._size + len(items)] = items
+        self._size += len(items)
+
+    def insert(self, index, item):
+        self._data = numpy.insert(self.array, index, self.row(item), axis=0)
+        self._size = len(self._data)
+
+    def pop(self, index=-1):
+        item = self[index]
+        del self[index]
+        return item
+
+    # bulk operations, these return a new list
+    def operand(self, other):
+        if isinstance(other, ArrayListVector):
+            return other.array
+        if isinstance(other, BaseVector):
+            return numpy.array(list(other), dtype=float)
+        return numpy.asarray(other, dtype=float)
+
+    def translate(self, offset):
+        return self.view(self.array + self.operand(offset))
+
+    def scale(self, factor):
+        return self.view(self.array * self.operand(factor))
+
+    def transform(self, matrix):
+        # matrix is either a (dims x dims) linear or a (dims + 1 x dims + 1) affine transform
+        dims = self.array.shape[1]
+        matrix = numpy.asarray(matrix, dtype=float)
+        ret = self.array.dot(matrix[:dims, :dims].T)
+        if matrix.shape[1] > dims:
+            ret += matrix[:dims, dims]
+        return self.view(ret)
+
+    def bounds(self):
+        # (minimum, maximum) corner vectors, or None for an empty list
+        if not self._size:
+            return None
+        return (self.VectorType(self.array.min(axis=0).tolist()), self.VectorType(self.array.max(axis=0).tolist()))
+
+    def __add__(self, other):
+        return self.translate(other)
+
+    def __sub__(self, other):
+        return self.view(self.array - self.operand(other))
+
+    def __mul__(self, other):
+        return self.scale(other)
+
+    @classmethod
+    def factory(cls, vector_type, name=None):
+        name = name or "ArrayList" + vector_type.__name__
+        return type(name, (cls,), {"VectorType": vector_type})
+
+def is_point_array(obj):
+    return numpy != None and isinstance(obj, numpy.ndarray)
+
+def point_array(value, dims):
+    # arrays and buffer objects are kept as an (N, dims) ndarray, without
+    # building a vector object per point.  returns None for anything else.
+    if numpy == None:
+        return None
+    if isinstance(value, numpy.ndarray):
+        arr = value
+    elif isinstance(value, array.array):
+        arr = numpy.frombuffer(value, dtype=value.typecode)
+    elif isinstance(value, memoryview) or hasattr(value, "__array_interface__") or hasattr(value, "__array__"):
+        arr = numpy.asarray(value)
+    else:
+        return None
+    if arr.ndim == 1:
+        arr = arr.reshape(-1, dims)
+    return arr
+
+def cast_points(list_type):
+    # cast function for point lists, see point_array()
+    dims = len(list_type.VectorType.Axes)
+    def cast(value):
+        arr = point_array(value, dims)
+        if arr is None:
+            return list_type(value)
+        return arr
+    return cast
+
 class Vector2D(BaseVector):
     Axes = ['x', 'y']
     AliasMap = {
@@ -116,6 +462,7 @@ class Vector2D(BaseVector):
         'y': ('Y', 'depth', 'd'),
     }
 ListVector2D = ListVector.factory(Vector2D)
+ArrayListVector2D = ArrayListVector.factory(Vector2D)
 
 class Vector3D(BaseVector):
     Axes = ['x', 'y', 'z']
@@ -125,3 +472,4 @@ class Vector3D(BaseVector):
         'z': ('Z', 'height', 'h'),
     }
 ListVector3D = ListVector.factory(Vector3D)
+ArrayListVector3D = ArrayListVector.factory(Vector3D)
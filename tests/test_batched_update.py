@@ -0,0 +1,46 @@
+from boiler import *
+
+class CountingCube(Cube):
+    def update(self, ref):
+        self.__dict__.setdefault("updates", []).append(sorted(ref))
+        super(CountingCube, self).update(ref)
+
+class CountingFrame(SCAD_Object):
+    Defaults = {
+        "inner": {"type": CountingCube},
+        "outer": {"type": CountingCube},
+    }
+
+class TestBatchedUpdate(unittest.TestCase):
+    def test_single_propagation_pass(self):
+        f = CountingFrame()
+        (f.inner, f.outer)
+        f.inner.__dict__["updates"] = []
+        f.update({"center": True, "debug": True, "disable": True})
+        self.assertEquals(f.inner.updates, [["center", "debug", "disable"]])
+        self.assertTrue(f.outer.center and f.outer.debug and f.outer.disable)
+
+    def test_cast(self):
+        c = Cylinder()
+        c.update({"radius": 2, "h": "3", "center": 1})
+        self.assertTrue(isinstance(c.radius, float))
+        self.assertEquals(c.height, 3.0)
+        self.assertTrue(c.center is True)
+
+    def test_invalid_value_writes_nothing(self):
+        c = Cylinder(r=1, h=2)
+        self.assertRaises(TypeError, c.update, {"radius": 5, "height": None})
+        self.assertEquals(c.radius, 1.0)
+        self.assertEquals(c.height, 2.0)
+
+    def test_mixed_keys(self):
+        t = Translate()
+        t.update({"vector": [1, 2, 3], "z": 5})
+        check_vector(t.vector, x=1, y=2, z=5)
+
+    def test_setters_per_class(self):
+        (castfunc, default_type, propagate) = Cylinder.Setters["center"]
+        self.assertEquals(default_type, bool)
+        self.assertTrue(propagate)
+        self.assertTrue("radius" in Cylinder.AutoProperties)
+        self.assertFalse("size" in Cube.AutoProperties)
@@ -0,0 +1,103 @@
+from boiler import *
+import math
+
+def box(lower, upper):
+    return BoundingBox(lower, upper)
+
+class TestBoundingBox(unittest.TestCase):
+    def test_box(self):
+        a = box((0, 0, 0), (2, 2, 2))
+        b = box((1, 1, 1), (3, 3, 3))
+        self.assertEquals(a.union(b), box((0, 0, 0), (3, 3, 3)))
+        self.assertEquals(a.intersection(b), box((1, 1, 1), (2, 2, 2)))
+        self.assertTrue(a.intersection(box((5, 5, 5), (6, 6, 6))).is_empty)
+        self.assertTrue(a.overlaps(box((2, 2, 2), (3, 3, 3))))
+        self.assertTrue(a.contains((1, 1)) and not a.contains((1, 1, 3)))
+        self.assertEquals(a.size, (2.0, 2.0, 2.0))
+        self.assertEquals(a.center, (1.0, 1.0, 1.0))
+
+    def test_empty_and_unbounded(self):
+        empty = BoundingBox.empty()
+        unbounded = BoundingBox.unbounded()
+        a = box((0, 0, 0), (1, 1, 1))
+        self.assertEquals(empty.union(a), a)
+        self.assertTrue(empty.intersection(a).is_empty)
+        self.assertEquals(unbounded.intersection(a), a)
+        self.assertEquals(unbounded.union(a), unbounded)
+        self.assertFalse(unbounded.is_bounded)
+        self.assertTrue(empty.translate((1, 2, 3)).is_empty)
+        self.assertEquals(unbounded.transform(rotation_matrix(45)), unbounded)
+        self.assertEquals(BoundingBox.from_points([]), empty)
+
+    def test_primitives(self):
+        self.assertEquals(Cube((1, 2, 3)).bbox(), box((0, 0, 0), (1, 2, 3)))
+        self.assertEquals(Cube(2, center=True).bbox(), box((-1, -1, -1), (1, 1, 1)))
+        self.assertEquals(Cylinder(r=2, h=4).bbox(), box((-2, -2, 0), (2, 2, 4)))
+        self.assertEquals(Cylinder(r1=1, r2=3, h=4, center=True).bbox(), box((-3, -3, -2), (3, 3, 2)))
+        self.assertEquals(Sphere(r=2).bbox(), box((-2, -2, -2), (2, 2, 2)))
+        self.assertEquals(Circle(r=2).bbox(), box((-2, -2, 0), (2, 2, 0)))
+        points = [[0, 0, 0], [1, 0, 0], [0, 2, 0], [0, 0, 3]]
+        faces = [[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]]
+        self.assertEquals(Polyhedron(points=points, faces=faces).bbox(), box((0, 0, 0), (1, 2, 3)))
+        self.assertEquals(Polygon(points=[[-1, 0], [1, 0], [0, 2]]).bbox(), box((-1, 0, 0), (1, 2, 0)))
+        self.assertFalse(Import(filename="part.stl").bbox().is_bounded)
+
+    def test_linear_extrude(self):
+        square = Polygon(points=[[0, 0], [2, 0], [2, 1], [0, 1]])
+        self.assertEquals(LinearExtrude(height=5)(square).bbox(), box((0, 0, 0), (2, 1, 5)))
+        self.assertEquals(LinearExtrude(height=4, center=True, scale=2.0)(square).bbox(), box((0, 0, -2), (4, 2, 2)))
+        twisted = LinearExtrude(height=5, twist=90)(square).bbox()
+        self.assertTrue(twisted.contains(box((-1, -2, 0), (2, 2, 5))))
+
+    def test_transforms(self):
+        cube = Cube((1, 2, 3))
+        self.assertEquals(Translate(x=5)(cube).bbox(), box((5, 0, 0), (6, 2, 3)))
+        self.assertEquals(Rotate(z=90)(cube).bbox(), box((-2, 0, 0), (0, 1, 3)))
+        self.assertEquals(Scale((2, -1, 1))(cube).bbox(), box((0, -2, 0), (2, 0, 3)))
+        self.assertEquals(Multmatrix([[1, 0, 0, 1], [0, 1, 0, 1], [0, 0, 1, 1]])(cube).bbox(), box((1, 1, 1), (2, 3, 4)))
+        # conservative for rotations off the axes
+        rotated = Rotate(z=45)(Cube(2, center=True)).bbox()
+        self.assertAlmostEqual(rotated.upper[0], math.sqrt(2))
+        self.assertAlmostEqual(rotated.lower[1], -math.sqrt(2))
+
+    def test_booleans(self):
+        a = Cube(2)
+        b = Translate(x=1)(Cube(2))
+        self.assertEquals(Union()(a, b).bbox(), box((0, 0, 0), (3, 2, 2)))
+        self.assertEquals(Intersection()(a, b).bbox(), box((1, 0, 0), (2, 2, 2)))
+        self.assertEquals(Difference()(a, b).bbox(), a.bbox())
+        self.assertEquals(Minkowski()(a, Sphere(r=1)).bbox(), box((-1, -1, -1), (3, 3, 3)))
+        self.assertEquals(Hull()(a, b).bbox(), box((0, 0, 0), (3, 2, 2)))
+        self.assertEquals(Projection()(b).bbox(), box((1, 0, 0), (3, 2, 0)))
+        self.assertTrue(Union().bbox().is_empty)
+        self.assertTrue(Intersection()(a, Translate(x=5)(Cube())).bbox().is_empty)
+
+    def test_modifiers(self):
+        scene = Union()(Cube(), Translate(x=5, background=True)(Cube()), Translate(x=-5, disable=True)(Cube()))
+        self.assertEquals(scene.bbox(), box((0, 0, 0), (1, 1, 1)))
+        self.assertEquals(Cube(debug=True).bbox(), box((0, 0, 0), (1, 1, 1)))
+
+    def test_composites(self):
+        self.assertEquals(Pipe(or1=8, ir1=7, h=20.0).bbox(), box((-8, -8, 0), (8, 8, 20)))
+
+    def test_memoized(self):
+        cube = Cube((1, 2, 3))
+        scene = Translate(x=1)(cube)
+        bbox = scene.bbox()
+        self.assertTrue(scene.bbox() is bbox)
+        cube.x = 4
+        self.assertEquals(scene.bbox(), box((1, 0, 0), (5, 2, 3)))
+        scene.x = 0
+        self.assertEquals(scene.bbox(), box((0, 0, 0), (4, 2, 3)))
+        pipe = Pipe(or1=8, ir1=7, h=20.0)
+        self.assertTrue(pipe.bbox() is pipe.bbox())
+        pipe.outer.radius = 9
+        self.assertEquals(pipe.bbox(), box((-9, -9, 0), (9, 9, 20)))
+
+    def test_memoized_scene(self):
+        # expanding composites and writing to unrelated objects keep the cache
+        scene = Union()(*[Translate(x=(20 * idx))(Pipe(or1=8, ir1=7, h=20.0)) for idx in range(3)])
+        bbox = scene.bbox()
+        Cube().size = [3, 3, 3]
+        self.assertTrue(scene.bbox() is bbox)
+        self.assertEquals(bbox, box((-8, -8, 0), (48, 8, 20)))
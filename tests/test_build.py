@@ -0,0 +1,56 @@
+from boiler import *
+
+class TestBuild(unittest.TestCase):
+    def setUp(self):
+        self._tdir = tempfile.mkdtemp()
+        self.exe = fake_open_scad_exe(self._tdir)
+
+    def tearDown(self):
+        shutil.rmtree(self._tdir)
+
+    def tdir(self, path):
+        return os.path.join(self._tdir, path)
+
+    def build(self, sizes, **kw):
+        build = Build(self.tdir("build.json"), engine=OpenSCAD(command=self.exe), jobs=2)
+        for (idx, size) in enumerate(sizes):
+            build.add(Cube(size), self.tdir("part_%d.stl" % idx), **kw)
+        return build
+
+    def test_incremental(self):
+        results = self.build([1, 2, 3]).run()
+        self.assertEquals(len(results), 3)
+        self.assertEquals(fake_open_scad_runs(self.exe), 3)
+        # nothing changed
+        self.assertEquals(self.build([1, 2, 3]).run(), [])
+        self.assertEquals(fake_open_scad_runs(self.exe), 3)
+        # one part changed
+        results = self.build([1, 5, 3]).run()
+        self.assertEquals([result.output for result in results], [self.tdir("part_1.stl")])
+        self.assertEquals(fake_open_scad_runs(self.exe), 4)
+        with open(self.tdir("part_1.stl")) as fh:
+            self.assertEquals(fh.read(), Cube(5).render_scad())
+
+    def test_missing_output_and_options(self):
+        self.build([1, 2]).run()
+        os.unlink(self.tdir("part_0.stl"))
+        self.assertEquals(len(self.build([1, 2]).outdated()), 1)
+        # changed render options change the digest too
+        self.assertEquals(len(self.build([1, 2], csglimit=10).outdated()), 2)
+        self.assertEquals(len(self.build([1, 2]).run(force=True)), 2)
+
+    def test_failed_outputs_are_rebuilt(self):
+        exe = fake_open_scad_exe(self._tdir, 'exit 1')
+        build = self.build([1])
+        build.engine = OpenSCAD(command=exe)
+        self.assertFalse(build.run()[0].ok)
+        self.assertEquals(BuildManifest(self.tdir("build.json")).outputs, {})
+        self.assertEquals(len(self.build([1]).outdated()), 1)
+
+    def test_manifest(self):
+        manifest = BuildManifest(self.tdir("build.json"))
+        manifest.set(self.tdir("out/part.stl"), "abc")
+        manifest.save()
+        manifest = BuildManifest(self.tdir("build.json"))
+        self.assertEquals(manifest.outputs, {os.path.join("out", "part.stl"): "abc"})
+        self.assertEquals(manifest.get(self.tdir("out/part.stl")), "abc")
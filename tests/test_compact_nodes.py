@@ -0,0 +1,54 @@
+from boiler import *
+import cPickle
+from scad.base import LazyDefault
+
+class TestCompactNodes(unittest.TestCase):
+    def test_only_overrides_are_stored(self):
+        c = Cube((1, 2, 3))
+        self.assertEquals(c.__namespace__.keys(), ["size"])
+        self.assertFalse(c.center)
+        self.assertTrue(c.size is not Cube().size)
+        self.assertTrue(Cube().size is Cube().size)
+        self.assertFalse("__stack__" in c.__dict__)
+        self.assertFalse("__children__" in c.__dict__)
+
+    def test_namespace_is_complete(self):
+        c = Cylinder(r=1, h=2)
+        ns = c.namespace
+        for key in Cylinder.Defaults:
+            self.assertTrue(key in ns)
+        self.assertTrue(isinstance(ns["resolution"], RadialResolution))
+        self.assertEquals(ns["center"], False)
+
+    def test_fingerprint_ignores_storage(self):
+        self.assertEquals(Cube((1, 2, 3)).fingerprint(), Cube((1, 2, 3), center=False).fingerprint())
+        self.assertNotEqual(Cube((1, 2, 3)).fingerprint(), Cube((1, 2, 3), center=True).fingerprint())
+
+    def test_children_are_tuples(self):
+        t = Translate(x=1)(Cube(), Sphere())
+        self.assertTrue(type(t.__children__) == tuple)
+        self.assertEquals(len(t.children), 2)
+        t.disown_children()
+        self.assertEquals(t.children, ())
+        self.assertFalse("__children__" in t.__dict__)
+
+    def test_stack_is_released(self):
+        c = Cylinder(r=1, h=2)
+        c.push()
+        self.assertTrue(type(c.__namespace__["resolution"]) == LazyDefault)
+        c.center = True
+        c.pop()
+        self.assertFalse(c.center)
+        self.assertFalse(c.resolution.center)
+        self.assertFalse("__stack__" in c.__dict__)
+
+    def test_propagate_to_unbuilt_inner(self):
+        p = Pipe(or1=8, ir1=7, h=20.0)
+        p.center = True
+        self.assertTrue(p.inner.center and p.outer.center)
+
+    def test_pickle(self):
+        c = Cylinder(r=1, h=2, center=True)
+        d = cPickle.loads(cPickle.dumps(c, cPickle.HIGHEST_PROTOCOL))
+        self.assertEquals(c.render_scad(), d.render_scad())
+        self.assertEquals(c.fingerprint(), d.fingerprint())
@@ -0,0 +1,123 @@
+from boiler import *
+
+class TestCSGOptimizer(unittest.TestCase):
+    def optimize(self, scene, removed):
+        optimizer = CSGOptimizer(scene)
+        ret = optimizer.optimize()
+        self.assertEquals(optimizer.removed, removed)
+        return ret
+
+    def test_flatten(self):
+        scene = Union()(Union()(Cube(), Union()(Sphere())), Cylinder())
+        answer = "union(){cube([1.0,1.0,1.0],center=false);sphere(r=1.0,center=false);cylinder(r=1.0,h=1.0,center=false);}"
+        code_compare(self.optimize(scene, 2).render_scad(), answer)
+        scene = Intersection()(Intersection()(Cube(), Sphere()), Cylinder())
+        self.assertEquals(len(self.optimize(scene, 1).children), 3)
+
+    def test_identity_transforms(self):
+        scene = Difference()(Translate(z=0)(Cube()), Rotate(0)(Sphere()), Scale((1, 1, 1))(Cylinder()))
+        answer = "difference(){cube([1.0,1.0,1.0],center=false);sphere(r=1.0,center=false);cylinder(r=1.0,h=1.0,center=false);}"
+        code_compare(self.optimize(scene, 3).render_scad(), answer)
+        # transforms that do something are kept
+        scene = Translate(x=1)(Rotate(z=90)(Cube()))
+        self.assertTrue(self.optimize(scene, 0) is scene)
+
+    def test_collapse(self):
+        scene = Render()(Union()(Translate()(Cube())))
+        code_compare(self.optimize(scene, 3).render_scad(), "cube([1.0,1.0,1.0],center=false);")
+
+    def test_empty_operands(self):
+        scene = Union()(Cube(), Union(), Sphere(), Translate(x=1)())
+        self.assertEquals(len(self.optimize(scene, 2).children), 2)
+        scene = Difference()(Cube(), Union(), Sphere())
+        self.assertEquals(len(self.optimize(scene, 1).children), 2)
+        # nothing to subtract from
+        scene = Union()(Difference()(Union(), Cube()), Sphere())
+        code_compare(self.optimize(scene, 4).render_scad(), "sphere(r=1.0,center=false);")
+
+    def test_modifiers_are_kept(self):
+        scene = Union()(Union(debug=True)(Cube()), Translate(disable=True)(Sphere()))
+        self.assertEquals(self.optimize(scene, 0).render_scad(), scene.render_scad())
+
+    def test_scene_is_not_changed(self):
+        inner = Union()(Cube(), Sphere())
+        scene = Union()(inner, Cylinder())
+        scad = scene.render_scad()
+        self.optimize(scene, 1)
+        self.assertEquals(scene.render_scad(), scad)
+        self.assertEquals(len(inner.children), 2)
+
+    def test_shared_subtrees(self):
+        post = Difference()(Cylinder(r=3, h=10), Union()(Cylinder(r=1, h=12)))
+        scene = Union()(Translate(x=1)(post), Translate(x=2)(post))
+        ret = self.optimize(scene, 1)
+        self.assertTrue(ret.children[0].children[0] is ret.children[1].children[0])
+
+    def test_composites(self):
+        scene = Union()(Pipe(or1=8, ir1=7, h=20.0), Union())
+        answer = "difference(){cylinder(r=8.0,h=20.0,center=false);cylinder(r=7.0,h=20.0,center=false);}"
+        code_compare(self.optimize(scene, 3).render_scad(), answer)
+
+    def test_openscad_optimize_option(self):
+        tdir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tdir, "scene.scad")
+            scene = Union()(Union()(Cube()), Translate()(Sphere()))
+            OpenSCAD().render(scene, fn, optimize=True)
+            with open(fn) as fh:
+                self.assertEquals(fh.read(), CSGOptimizer(scene).optimize().render_scad())
+            OpenSCAD().render(scene, fn)
+            with open(fn) as fh:
+                self.assertEquals(fh.read(), scene.render_scad())
+        finally:
+            shutil.rmtree(tdir)
+
+    def test_cull_difference(self):
+        holes = [Translate(x=x)(Cylinder(r=0.5, h=20)) for x in (2, 5, 50, 80)]
+        scene = Difference()(Cube((10, 10, 2)), *holes)
+        optimizer = CSGOptimizer(scene)
+        ret = optimizer.optimize()
+        self.assertEquals(optimizer.culled, 2)
+        self.assertEquals(optimizer.removed, 4)
+        self.assertEquals(len(ret.children), 3)
+        # nothing left to subtract
+        scene = Difference()(Cube(), Translate(x=5)(Cube()))
+        code_compare(self.optimize(scene, 3).render_scad(), "cube([1.0,1.0,1.0],center=false);")
+        # touching counts as overlapping
+        scene = Difference()(Cube(), Translate(x=1)(Cube()))
+        self.assertTrue(self.optimize(scene, 0) is scene)
+        # unknown extents are kept
+        scene = Difference()(Cube(), Import(filename="part.stl"))
+        self.assertTrue(self.optimize(scene, 0) is scene)
+
+    def test_cull_intersection(self):
+        scene = Union()(Sphere(), Intersection()(Cube(), Translate(x=5)(Cube())))
+        optimizer = CSGOptimizer(scene)
+        code_compare(optimizer.optimize().render_scad(), "sphere(r=1.0,center=false);")
+        self.assertEquals(optimizer.culled, 2)
+        scene = Intersection()(Cube(2), Translate(x=1)(Cube(2)))
+        self.assertTrue(self.optimize(scene, 0) is scene)
+
+    def test_cull_modifiers(self):
+        scene = Difference()(Cube(), Translate(x=5, debug=True)(Cube()))
+        self.assertTrue(self.optimize(scene, 0) is scene)
+        scene = Difference()(Cube(background=True), Translate(x=5)(Cube()))
+        self.assertTrue(self.optimize(scene, 0) is scene)
+
+    def test_cull_planar(self):
+        # OpenSCAD ignores z offsets of 2D geometry, the hole cuts the circle
+        scene = Difference()(Circle(r=5), Translate((1, 0, 1))(Circle(r=1)))
+        self.assertTrue(self.optimize(scene, 0) is scene)
+        scene = Difference()(Circle(r=5), Translate(x=20)(Circle(r=1)))
+        self.assertTrue(self.optimize(scene, 0) is scene)
+        scene = Intersection()(Circle(r=5), Translate(z=3)(Polygon(points=[[0, 0], [1, 0], [0, 1]])))
+        self.assertTrue(self.optimize(scene, 0) is scene)
+        # extruded 2D geometry is 3D again
+        scene = Difference()(Cube(), Translate(z=5)(LinearExtrude(height=1)(Circle())))
+        code_compare(self.optimize(scene, 4).render_scad(), "cube([1.0,1.0,1.0],center=false);")
+
+    def test_cull_disabled(self):
+        scene = Difference()(Cube(), Translate(x=5)(Cube()))
+        optimizer = CSGOptimizer(scene, cull=False)
+        self.assertTrue(optimizer.optimize() is scene)
+        self.assertEquals(optimizer.culled, 0)
@@ -0,0 +1,65 @@
+from boiler import *
+import math
+
+def fragments(obj):
+    return int(obj.resolution.fn)
+
+class TestFacetBudget(unittest.TestCase):
+    def scene(self):
+        small = Cylinder(r=1, h=10, fn=200)
+        return Union()(Cylinder(r=50, h=10, fn=200), Translate(x=5)(small), Translate(x=8)(small), Sphere(r=10, fn=200))
+
+    def test_within_budget(self):
+        scene = self.scene()
+        budget = FacetBudget(scene, 500)
+        ret = budget.schedule()
+        self.assertTrue(budget.facets <= 500)
+        (big, small, other, sphere) = (ret.children[0], ret.children[1].children[0], ret.children[2].children[0], ret.children[3])
+        # larger features get more fragments
+        self.assertTrue(fragments(big) > fragments(sphere) > fragments(small))
+        self.assertEquals(fragments(small), 5)
+        # the model is RadialResolution.get_fragments
+        resolution = RadialResolution(fs=budget.fs, fa=budget.fa)
+        self.assertEquals(fragments(big), resolution.get_fragments(2 * math.pi * 50))
+        # shared features are paid for per occurrence
+        self.assertTrue(small is other)
+        total = big.estimate_facets(fragments(big)) + 2 * small.estimate_facets(5) + sphere.estimate_facets(fragments(sphere))
+        self.assertEquals(budget.facets, total)
+
+    def test_presets(self):
+        preview = FacetBudget(self.scene(), "preview")
+        final = FacetBudget(self.scene(), "final")
+        (preview_scene, final_scene) = (preview.schedule(), final.schedule())
+        self.assertTrue(preview.facets <= FacetBudget.Presets["preview"]["budget"])
+        self.assertTrue(preview.facets < final.facets)
+        self.assertEquals(fragments(preview_scene.children[0]), 60)
+        self.assertEquals(fragments(final_scene.children[0]), 360)
+        self.assertRaises(ValueError, FacetBudget, self.scene(), "draft")
+
+    def test_too_small(self):
+        budget = FacetBudget(self.scene(), 10)
+        ret = budget.schedule()
+        self.assertEquals(fragments(ret.children[0]), 5)
+        self.assertTrue(budget.facets > 10)
+
+    def test_scene_is_not_changed(self):
+        scene = self.scene()
+        scad = scene.render_scad()
+        FacetBudget(scene, 500).schedule()
+        self.assertEquals(scene.render_scad(), scad)
+
+    def test_composites(self):
+        arc = SemiCylinder(radius=5, height=2, angle=180, fn=200)
+        scene = Union()(arc, Pipe(or1=8, ir1=7, h=20.0))
+        budget = FacetBudget(scene, 200)
+        ret = budget.schedule()
+        self.assertTrue(budget.facets <= 200)
+        # the arc is scheduled before its points are built
+        self.assertTrue(len(ret.children[0].points) < len(arc.points))
+        self.assertEquals(ret.render_scad().count("$fn="), 2)
+
+    def test_no_features(self):
+        scene = Union()(Cube(), Translate(x=1)(Cube()))
+        budget = FacetBudget(scene, 100)
+        self.assertTrue(budget.schedule() is scene)
+        self.assertEquals(budget.facets, 0)
@@ -0,0 +1,84 @@
+from boiler import *
+
+class TestFingerprint(unittest.TestCase):
+    def test_identical_nodes(self):
+        c1 = Cube((1, 2, 3))
+        c2 = Cube((1, 2, 3), name="other")
+        self.assertNotEquals(c1.name, c2.name)
+        self.assertEquals(c1.fingerprint(), c2.fingerprint())
+        self.assertNotEquals(c1.fingerprint(), Cube((1, 2, 4)).fingerprint())
+        self.assertNotEquals(c1.fingerprint(), Cube((1, 2, 3), center=True).fingerprint())
+
+    def test_class_is_part_of_fingerprint(self):
+        self.assertNotEquals(Union().fingerprint(), Difference().fingerprint())
+        self.assertNotEquals(Translate(x=1).fingerprint(), Scale(x=1).fingerprint())
+
+    def test_children(self):
+        u1 = Union()(Cube(), Sphere(r=2))
+        u2 = Union()(Cube(), Sphere(r=2))
+        u3 = Union()(Sphere(r=2), Cube())
+        self.assertEquals(u1.fingerprint(), u2.fingerprint())
+        self.assertNotEquals(u1.fingerprint(), u3.fingerprint())
+
+    def test_invalidation(self):
+        c = Cube((1, 2, 3))
+        u = Union()(Translate(x=1)(c))
+        before = u.fingerprint()
+        self.assertEquals(before, u.fingerprint())
+        c.x = 5
+        changed = u.fingerprint()
+        self.assertNotEquals(before, changed)
+        c.x = 1
+        self.assertEquals(before, u.fingerprint())
+        u.children[0](c, Sphere())
+        self.assertNotEquals(before, u.fingerprint())
+
+    def test_unrelated_writes(self):
+        # only writes below a node invalidate its fingerprint
+        c = Cube((1, 2, 3))
+        u = Union()(Translate(x=1)(c), Sphere())
+        u.fingerprint()
+        cached = u.__dict__["__fingerprint__"]
+        other = Cube()
+        other.size = [3, 3, 3]
+        Union()(Cube())
+        u.fingerprint()
+        self.assertTrue(u.__dict__["__fingerprint__"] is cached)
+        # shared nodes invalidate every parent
+        t = Translate(x=2)(c)
+        t.fingerprint()
+        c.y = 7
+        self.assertEquals(t.fingerprint(), Translate(x=2)(Cube((1, 7, 3))).fingerprint())
+        self.assertEquals(u.fingerprint(), Union()(Translate(x=1)(Cube((1, 7, 3))), Sphere()).fingerprint())
+
+    def test_removed_children(self):
+        c = Cube()
+        u = Union()(c)
+        u(Sphere())
+        before = u.fingerprint()
+        c.x = 4
+        self.assertTrue(u.fingerprint() is before)
+
+    def test_parents_are_listed_once(self):
+        c = Cylinder()
+        res = RadialResolution(fn=10)
+        for idx in range(100):
+            c.resolution = res
+        u = Union()(c, c)
+        self.assertEquals(res.get_parents(), [c])
+        self.assertEquals(c.get_parents(), [u])
+        t = Translate()(c)
+        self.assertEquals(sorted(c.get_parents()), sorted([u, t]))
+        u(Sphere())
+        t(Sphere())
+        self.assertEquals(c.get_parents(), [])
+        before = c.fingerprint()
+        res.fn = 12
+        self.assertNotEquals(c.fingerprint(), before)
+
+    def test_composite(self):
+        p1 = Pipe(or1=8, ir1=7, h=20.0)
+        p2 = Pipe(or1=8, ir1=7, h=20.0)
+        self.assertEquals(p1.fingerprint(), p2.fingerprint())
+        p2.inner.radius = 6
+        self.assertNotEquals(p1.fingerprint(), p2.fingerprint())
@@ -0,0 +1,71 @@
+from boiler import *
+import pickle
+
+class TestFrozenVector(unittest.TestCase):
+    def test_construct(self):
+        v1 = FrozenVector3D([1, 2, 3])
+        check_vector(v1, x=1, y=2, z=3)
+        self.assertTrue(isinstance(v1.x, float))
+        check_vector(FrozenVector3D(y=5), x=0, y=5, z=0)
+        check_vector(FrozenVector3D([1]), x=1, y=0, z=0)
+        self.assertEquals(v1["y"], 2)
+        self.assertTrue(FrozenVector3D(v1) is v1)
+        self.assertRaises(TypeError, FrozenVector3D, [1, 2, 3, 4])
+
+    def test_aliases(self):
+        # the aliases Vector3D knows about
+        v1 = FrozenVector3D([1, 2, 3])
+        self.assertEquals((v1.width, v1.depth, v1.height), (1, 2, 3))
+        self.assertEquals((v1.w, v1.d, v1.h, v1.X, v1.Y, v1.Z), (1, 2, 3, 1, 2, 3))
+        check_vector(v1.replace(width=4, h=6), x=4, y=2, z=6)
+        self.assertEquals(FrozenVector2D([1, 2]).depth, 2)
+        c = Cube((1, 2, 3))
+        self.assertEquals((c.size.width, c.size.depth, c.size.height), (1, 2, 3))
+        self.assertEquals(Translate(z=4).vector.height, 4)
+
+    def test_immutable(self):
+        v1 = FrozenVector3D([1, 2, 3])
+        self.assertRaises(AttributeError, setattr, v1, "x", 5)
+        self.assertRaises(AttributeError, setattr, v1, "w", 5)
+        v2 = v1.replace(x=5)
+        check_vector(v1, x=1, y=2, z=3)
+        check_vector(v2, x=5, y=2, z=3)
+
+    def test_arithmetic(self):
+        v1 = FrozenVector3D([1, 2, 3])
+        v2 = FrozenVector3D([4, 5, 6])
+        check_vector(v1 + v2, x=5, y=7, z=9)
+        check_vector(v2 - v1, x=3, y=3, z=3)
+        check_vector(v1 * 2, x=2, y=4, z=6)
+        check_vector(-v1, x=-1, y=-2, z=-3)
+        self.assertEquals(v1.dotproduct(v2), 32)
+
+    def test_matches_vector_3d(self):
+        pairs = [([2, 1, 5], [1, 2, 3]), ([6.1, 51, 3.0], [1.9, 99, 2.9])]
+        for (a, b) in pairs:
+            self.assertEquals(list(FrozenVector3D(a).crossproduct(b)), list(Vector3D(a).crossproduct(Vector3D(b))))
+            self.assertEquals(FrozenVector3D(a).distance(b), Vector3D(a).distance(Vector3D(b)))
+
+    def test_pickle(self):
+        v1 = FrozenVector2D([1, 2])
+        self.assertEquals(pickle.loads(pickle.dumps(v1, 2)), v1)
+        self.assertEquals(type(pickle.loads(pickle.dumps(v1))), FrozenVector2D)
+
+    def test_primitives(self):
+        c = Cube((1, 2, 3))
+        self.assertTrue(isinstance(c.size, FrozenVector3D))
+        size = c.size
+        c.x = 5
+        check_vector(c.size, x=5, y=2, z=3)
+        check_vector(size, x=1, y=2, z=3)
+        code_compare(c.render_scad(), "cube([5.0, 2.0, 3.0], center=false);")
+        t = Translate(x=1, z=2)
+        code_compare(t.render_scad(), "translate([1.0, 0.0, 2.0]);")
+        r = Rotate(y=90)
+        r.z = 45
+        code_compare(r.render_scad(), "rotate(a=[0.0, 90.0, 45.0]);")
+
+    def test_2d_args(self):
+        # two-element vectors must not be mistaken for name=value pairs
+        p = Cube()
+        self.assertEquals(p.translate_arg_to_scad(FrozenVector2D([1, 2])), "[1.0, 2.0]")
@@ -0,0 +1,43 @@
+from boiler import *
+from scad.base import LazyDefault
+
+class TestLazyDefaults(unittest.TestCase):
+    def test_not_built_until_read(self):
+        c = Cylinder(r=1, h=2)
+        self.assertFalse("resolution" in c.__namespace__)
+        self.assertTrue(isinstance(c.resolution, RadialResolution))
+        self.assertTrue(c.resolution is c.resolution)
+        self.assertTrue(c.__namespace__["resolution"] is c.resolution)
+
+    def test_keyword_overrides(self):
+        res = RadialResolution(fn=12)
+        c = Cylinder(r=1, h=2, resolution=res)
+        self.assertTrue(c.__namespace__["resolution"] is res)
+        c = Cylinder(r=1, h=2, fn=20)
+        self.assertEquals(c.resolution.fn, 20)
+
+    def test_pending_propagation(self):
+        p = Frame(center=True, debug=True)
+        self.assertTrue(type(p.__namespace__["inner"]) == LazyDefault)
+        self.assertTrue(p.inner.center)
+        self.assertTrue(p.outer.debug)
+        p.center = False
+        self.assertFalse(p.inner.center)
+
+    def test_nested_pending_propagation(self):
+        p = Pipe(center=True)
+        self.assertTrue(p.inner.center)
+        self.assertTrue(p.inner.resolution.center)
+
+    def test_push_pop_shares(self):
+        c = Cylinder(r=1, h=2)
+        c.push()
+        c.fn = 10
+        c.pop()
+        # inner objects are shared with the snapshot, as before
+        self.assertEquals(c.resolution.fn, 10)
+
+    def test_output(self):
+        answer = "cylinder(r=1.0, h=2.0, center=false);"
+        code_compare(Cylinder(r=1, h=2).render_scad(), answer)
+        self.assertEquals(Cylinder(r=1, h=2).fingerprint(), Cylinder(r=1, h=2, fn=0).fingerprint())
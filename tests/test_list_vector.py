@@ -0,0 +1,85 @@
+from boiler import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+class ListVectorMixin(object):
+    def test_items(self):
+        lv = self.ListType([[1, 2, 3], [4, 5, 6]])
+        self.assertEquals(len(lv), 2)
+        self.assertTrue(isinstance(lv[0], Vector3D))
+        self.assertEquals(lv[1].y, 5)
+        lv[0] = [7, 8, 9]
+        self.assertEquals(lv[0].z, 9)
+        lv.append(Vector3D([1, 1, 1]))
+        lv.extend([[2, 2, 2], [3, 3, 3]])
+        self.assertEquals(len(lv), 5)
+        self.assertEquals([vec.x for vec in lv], [7, 4, 1, 2, 3])
+
+    def test_translate(self):
+        lv = self.ListType([[1, 2, 3], [4, 5, 6]])
+        moved = lv.translate(Vector3D([1, -1, 0.5]))
+        self.assertEquals([list(vec) for vec in moved], [[2, 1, 3.5], [5, 4, 6.5]])
+        self.assertEquals([list(vec) for vec in lv], [[1, 2, 3], [4, 5, 6]])
+
+    def test_scale(self):
+        lv = self.ListType([[1, 2, 3], [4, 5, 6]])
+        self.assertEquals([list(vec) for vec in lv.scale(2)], [[2, 4, 6], [8, 10, 12]])
+        self.assertEquals([list(vec) for vec in lv.scale([1, 0, -1])], [[1, 0, -3], [4, 0, -6]])
+
+    def test_transform(self):
+        lv = self.ListType([[1, 2, 3]])
+        swap = [[0, 1, 0], [1, 0, 0], [0, 0, 1]]
+        self.assertEquals([list(vec) for vec in lv.transform(swap)], [[2, 1, 3]])
+        affine = [[1, 0, 0, 10], [0, 1, 0, 20], [0, 0, 1, 30], [0, 0, 0, 1]]
+        self.assertEquals([list(vec) for vec in lv.transform(affine)], [[11, 22, 33]])
+
+    def test_bounds(self):
+        lv = self.ListType([[1, 5, 3], [4, 2, -6]])
+        (lower, upper) = lv.bounds()
+        self.assertEquals(list(lower), [1, 2, -6])
+        self.assertEquals(list(upper), [4, 5, 3])
+        self.assertEquals(self.ListType().bounds(), None)
+
+    def test_polyhedron(self):
+        lv = self.ListType([[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+        p = Polyhedron(points=lv, faces=[[0, 1, 2]])
+        answer = "polyhedron(points=[[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], faces=[[0.0, 1.0, 2.0]]);"
+        code_compare(p.render_scad(), answer)
+
+class TestListVector(ListVectorMixin, unittest.TestCase):
+    ListType = ListVector3D
+
+@unittest.skipUnless(numpy, "numpy is not available")
+class TestArrayListVector(ListVectorMixin, unittest.TestCase):
+    ListType = ArrayListVector3D
+
+    def test_view(self):
+        arr = numpy.zeros((4, 3))
+        lv = ArrayListVector3D.view(arr)
+        lv[1] = [1, 2, 3]
+        self.assertEquals(arr[1].tolist(), [1, 2, 3])
+        self.assertTrue(numpy.asarray(lv) is arr or numpy.asarray(lv).base is arr)
+        part = lv[1:3]
+        part[0] = [4, 4, 4]
+        self.assertEquals(arr[1].tolist(), [4, 4, 4])
+
+    def test_operators(self):
+        lv = ArrayListVector3D([[1, 2, 3]])
+        self.assertEquals((lv + Vector3D([1, 1, 1])).tolist(), [[2, 3, 4]])
+        self.assertEquals((lv - [1, 2, 3]).tolist(), [[0, 0, 0]])
+        self.assertEquals((lv * 3).tolist(), [[3, 6, 9]])
+
+    def test_append_growth(self):
+        lv = ArrayListVector3D()
+        for idx in range(100):
+            lv.append([idx, idx, idx])
+        self.assertEquals(len(lv), 100)
+        self.assertEquals(lv[99].x, 99)
+        self.assertEquals(lv.pop().x, 99)
+        self.assertEquals(len(lv), 99)
+
+    def test_equality(self):
+        self.assertEquals(ArrayListVector3D([[1, 2, 3]]), ListVector3D([[1, 2, 3]]))
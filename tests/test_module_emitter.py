@@ -0,0 +1,63 @@
+from boiler import *
+
+class TestModuleEmitter(unittest.TestCase):
+    def post(self):
+        return Difference()(Cylinder(r=3, h=10), Cylinder(r=1, h=12))
+
+    def test_shared_subtrees(self):
+        scene = Union()(Translate(x=10)(self.post()), Translate(x=-10)(self.post()), Cube())
+        scad = ModuleEmitter(scene).render_scad()
+        self.assertEquals(scad.count("module m_"), 1)
+        self.assertEquals(scad.count("difference()"), 1)
+        name = scad.split("module ")[1].split("()")[0]
+        self.assertEquals(scad.count("%s();" % name), 2)
+        answer = "module %s(){difference(){cylinder(r=3.0,h=10.0,center=false);cylinder(r=1.0,h=12.0,center=false);}}" % name
+        answer += "union(){translate([10.0,0.0,0.0]){%s();}translate([-10.0,0.0,0.0]){%s();}cube([1.0,1.0,1.0],center=false);}" % (name, name)
+        code_compare(scad, answer)
+
+    def test_nested_modules(self):
+        pair = lambda: Union()(Translate(x=1)(self.post()), Translate(x=2)(self.post()))
+        scene = Union()(Translate(y=1)(pair()), Translate(y=2)(pair()))
+        scad = ModuleEmitter(scene).render_scad()
+        # the pair and the post are each defined once
+        self.assertEquals(scad.count("module m_"), 2)
+        self.assertEquals(scad.count("difference()"), 1)
+        self.assertLess(scad.index("difference()"), scad.index("translate([1.0"))
+
+    def test_globals(self):
+        scene = Union()(Translate(x=10)(self.post()), Translate(x=-10)(self.post()))
+        scad = ModuleEmitter(SCAD_Globals(fn=32)(scene)).render_scad()
+        self.assertEquals(scad.count("module m_"), 1)
+        self.assertEquals(scad.count("difference()"), 1)
+        # the header goes between the module definitions and the scene
+        plain = ModuleEmitter(scene).render_scad()
+        idx = plain.index("union()")
+        code_compare(scad, plain[:idx] + "$fn = 32;\n" + plain[idx:])
+
+    def test_unique_scene(self):
+        scene = Union()(Cube(), Translate(x=1)(Sphere()))
+        code_compare(ModuleEmitter(scene).render_scad(), scene.render_scad())
+
+    def test_small_leaves_are_inlined(self):
+        scene = Union()(Translate(x=1)(Cube()), Translate(x=2)(Cube()))
+        scad = ModuleEmitter(scene).render_scad()
+        self.assertNotIn("module", scad)
+        scad = ModuleEmitter(scene, min_size=0).render_scad()
+        self.assertEquals(scad.count("module m_"), 1)
+
+    def test_composites(self):
+        scene = Union()(Pipe(or1=8, ir1=7, h=20.0), Translate(x=20)(Pipe(or1=8, ir1=7, h=20.0)))
+        scad = ModuleEmitter(scene).render_scad()
+        self.assertEquals(scad.count("module m_"), 1)
+        self.assertEquals(scad.count("render()"), 1)
+
+    def test_openscad_modules_option(self):
+        tdir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tdir, "posts.scad")
+            scene = Union()(Translate(x=10)(self.post()), Translate(x=-10)(self.post()))
+            OpenSCAD().render(scene, fn, modules=True)
+            with open(fn) as fh:
+                self.assertEquals(fh.read(), ModuleEmitter(scene).render_scad())
+        finally:
+            shutil.rmtree(tdir)
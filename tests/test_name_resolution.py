@@ -1,4 +1,5 @@
 from boiler import *
+import threading
 
 class TestNameResolution(unittest.TestCase):
     def test_name_attribute(self):
@@ -27,3 +28,75 @@ class TestNameResolution(unittest.TestCase):
         u = Union()(c1, tr)
         self.assertEquals(c1, u.bob)
         self.assertEquals(c1, u.bob_tr.bob)
+
+    def test_duplicate_names(self):
+        c1 = Cube(name="bob")
+        c2 = Cube(name="bob")
+        u = Union()(c1, c2)
+        self.assertTrue(u.bob is c1)
+        self.assertTrue(u.get_child("bob") is c1)
+        self.assertEquals(u.get_child("ann"), None)
+
+    def test_index_follows_changes(self):
+        c1 = Cube(name="bob")
+        c2 = Cube(name="ann")
+        u = Union()(c1)
+        self.assertTrue(u.bob is c1)
+        u(c2)
+        self.assertTrue(u.ann is c2)
+        self.assertRaises(AttributeError, getattr, u, "bob")
+        c2.name = "eve"
+        self.assertTrue(u.eve is c2)
+        self.assertRaises(AttributeError, getattr, u, "ann")
+        u.disown_children()
+        self.assertRaises(AttributeError, getattr, u, "eve")
+
+    def test_many_children(self):
+        cubes = [Cube(name="cube_%d" % idx) for idx in range(5000)]
+        u = Union()(cubes)
+        for cube in cubes:
+            self.assertTrue(getattr(u, cube.name) is cube)
+
+    def test_name_context(self):
+        def build():
+            with NameContext():
+                return [Cube().name, Cube().name, Sphere().name]
+        first = build()
+        Cube()
+        self.assertEquals(first, build())
+        self.assertEquals(first, ["Cube_1", "Cube_2", "Sphere_1"])
+
+    def test_name_context_threads(self):
+        results = {}
+        def build(idx):
+            with NameContext():
+                results[idx] = [c.name for c in Union()([Cube() for cnt in range(200)]).children]
+        threads = [threading.Thread(target=build, args=(idx,)) for idx in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEquals(len(set([str(val) for val in results.values()])), 1)
+        self.assertEquals(results[0][-1], "Cube_200")
+
+    def test_shared_context_is_thread_safe(self):
+        ctx = NameContext()
+        names = []
+        def build():
+            for cnt in range(500):
+                names.append(ctx.next_name("Cube"))
+        threads = [threading.Thread(target=build) for idx in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEquals(len(set(names)), 2000)
+
+    def test_anonymous(self):
+        with NameContext(anonymous=True):
+            c1 = Cube()
+            u = Union()(c1, Cube(name="bob"))
+        self.assertEquals(c1.name, None)
+        self.assertTrue(u.bob is not c1)
+        self.assertEquals(Cube().fingerprint(), c1.fingerprint())
+        self.assertEquals(Vector3D([1, 2, 3]).name, None)
@@ -0,0 +1,47 @@
+from boiler import *
+import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+@unittest.skipUnless(numpy, "numpy is not available")
+class TestPointArrays(unittest.TestCase):
+    def test_polyhedron_array(self):
+        points = numpy.array([[1, 1, 1], [2, 2, 2], [3, 3, 3]], dtype=float)
+        faces = numpy.array([[0, 1, 2]])
+        p = Polyhedron(points=points, faces=faces)
+        self.assertTrue(p.points is points)
+        self.assertTrue(p.faces is faces)
+        answer = "polyhedron(points=[[1.0, 1.0, 1.0], [2.0, 2.0, 2.0], [3.0, 3.0, 3.0]], faces=[[0, 1, 2]]);"
+        code_compare(p.render_scad(), answer)
+        self.assertEquals(p.get_scad_args()[0], ("points", points.tolist()))
+
+    def test_polygon_buffer(self):
+        points = array.array('d', [0, 0, 1, 0, 0, 1])
+        p = Polygon(points=points)
+        self.assertEquals(p.points.shape, (3, 2))
+        answer = "polygon(points=[[0.0, 0.0], [1.0, 0.0], [0.0, 1.0]]);"
+        code_compare(p.render_scad(), answer)
+
+    def test_lists_still_cast(self):
+        p = Polyhedron(points=[[1, 2, 3]], faces=[[0, 0, 0]])
+        self.assertTrue(isinstance(p.points, ListVector3D))
+
+    def test_large_array(self):
+        points = numpy.arange(30000, dtype=float).reshape(-1, 3)
+        p = Polyhedron(points=points, faces=numpy.arange(30000).reshape(-1, 3))
+        answer = Polyhedron(points=points.tolist(), faces=[[0, 1, 2]]).render_scad()
+        scad = p.render_scad()
+        self.assertEquals(scad.split("faces=")[0], answer.split("faces=")[0])
+
+    def test_fingerprint(self):
+        points = numpy.arange(3000, dtype=float).reshape(-1, 3)
+        p1 = Polyhedron(points=points, faces=[[0, 1, 2]])
+        p2 = Polyhedron(points=points.copy(), faces=[[0, 1, 2]])
+        self.assertEquals(p1.fingerprint(), p2.fingerprint())
+        points2 = points.copy()
+        points2[500, 1] = -1
+        p2.points = points2
+        self.assertNotEquals(p1.fingerprint(), p2.fingerprint())
@@ -0,0 +1,65 @@
+from boiler import *
+
+class TestPushPop(unittest.TestCase):
+    def test_restore(self):
+        c = Cube((1, 2, 3))
+        c.push()
+        c.x = 5
+        c.center = True
+        self.assertEquals(c.size.x, 5)
+        c.pop()
+        check_vector(c.size, x=1, y=2, z=3)
+        self.assertFalse(c.center)
+
+    def test_copy_on_write(self):
+        c = Cube((1, 2, 3))
+        ns = c.__namespace__
+        c.push()
+        self.assertTrue(c.__namespace__ is ns)
+        self.assertTrue(c.stack[-1] is ns)
+        c.center = True
+        self.assertFalse(c.__namespace__ is ns)
+        self.assertFalse("center" in ns)
+        c.pop()
+        self.assertTrue(c.__namespace__ is ns)
+
+    def test_nested(self):
+        c = Cube((1, 2, 3))
+        c.push()
+        c.push()
+        c.x = 2
+        c.pop()
+        self.assertEquals(c.x, 1)
+        c.x = 3
+        c.pop()
+        self.assertEquals(c.x, 1)
+        self.assertEquals(c.stack, ())
+
+    def test_pop_repropagates(self):
+        p = Pipe(or1=8, ir1=7, h=20.0)
+        p.push()
+        p.center = True
+        self.assertTrue(p.inner.center)
+        p.pop()
+        self.assertFalse(p.center)
+        self.assertFalse(p.inner.center)
+        self.assertFalse(p.outer.resolution.center)
+
+    def test_descend(self):
+        c1 = Cube((1, 2, 3))
+        t = Translate(x=1)(Union()(c1))
+        t.push(descend=True)
+        t.x = 4
+        c1.x = 4
+        t.pop(descend=True)
+        self.assertEquals(t.x, 1)
+        self.assertEquals(c1.x, 1)
+
+    def test_fingerprint(self):
+        c = Cube((1, 2, 3))
+        before = c.fingerprint()
+        c.push()
+        c.x = 5
+        self.assertNotEquals(before, c.fingerprint())
+        c.pop()
+        self.assertEquals(before, c.fingerprint())
@@ -0,0 +1,65 @@
+from boiler import *
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self._tdir = tempfile.mkdtemp()
+        self.exe = fake_open_scad_exe(self._tdir)
+        self.cache = RenderCache(self.tdir("cache"))
+
+    def tearDown(self):
+        shutil.rmtree(self._tdir)
+
+    def tdir(self, path):
+        return os.path.join(self._tdir, path)
+
+    def render(self, scene, fn, **kw):
+        scad = OpenSCAD(command=self.exe, cache=self.cache)
+        scad.render(scene, self.tdir(fn), **kw)
+        with open(self.tdir(fn)) as fh:
+            return fh.read()
+
+    def test_cache_hit(self):
+        scene = Union()(Cube(), Sphere(r=2))
+        first = self.render(scene, "first.stl")
+        self.assertEquals(fake_open_scad_runs(self.exe), 1)
+        second = self.render(Union()(Cube(), Sphere(r=2)), "second.stl")
+        self.assertEquals(fake_open_scad_runs(self.exe), 1)
+        self.assertEquals(first, second)
+        self.assertEquals(first, scene.render_scad())
+        stats = self.cache.stats
+        self.assertEquals(stats["hits"], 1)
+        self.assertEquals(stats["misses"], 1)
+        self.assertEquals(stats["entries"], 1)
+
+    def test_cache_miss(self):
+        self.render(Cube(), "part.stl")
+        self.render(Cube(2), "part.stl")
+        # same scene, different options
+        self.render(Cube(2), "part.stl", csglimit=1000)
+        self.render(Cube(2), "part.png")
+        self.assertEquals(fake_open_scad_runs(self.exe), 4)
+        self.assertEquals(self.cache.stats["misses"], 4)
+        self.assertEquals(self.cache.stats["entries"], 4)
+
+    def test_hard_link(self):
+        self.cache.link = True
+        self.render(Cube(), "first.stl")
+        self.render(Cube(), "second.stl")
+        self.assertEquals(os.stat(self.tdir("second.stl")).st_nlink, 2)
+
+    def test_eviction(self):
+        self.cache.max_size = 1
+        self.render(Cube(), "first.stl")
+        self.assertEquals(self.cache.stats["entries"], 0)
+        self.assertEquals(self.cache.evictions, 1)
+        self.cache.max_size = 1 << 20
+        for size in range(1, 4):
+            self.render(Cube(size), "part.stl")
+        self.assertEquals(self.cache.stats["entries"], 3)
+        entries = sorted(self.cache.entries())
+        oldest = entries[0]
+        os.utime(oldest[2], (oldest[0] - 10, oldest[0] - 10))
+        self.cache.max_size = self.cache.size() - 1
+        self.cache.evict()
+        self.assertFalse(os.path.exists(oldest[2]))
+        self.assertEquals(self.cache.stats["entries"], 2)
@@ -0,0 +1,46 @@
+from boiler import *
+import time
+
+class Broken(SCAD_Object):
+    pass
+
+class TestRenderMany(unittest.TestCase):
+    def setUp(self):
+        self._tdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._tdir)
+
+    def tdir(self, path):
+        return os.path.join(self._tdir, path)
+
+    def test_render_many(self):
+        exe = fake_open_scad_exe(self._tdir, 'sleep 0.5; cp "$1" "$3"')
+        scad = OpenSCAD(command=exe)
+        renders = [(Cube(idx + 1), self.tdir("part_%d.stl" % idx)) for idx in range(4)]
+        started = time.time()
+        results = scad.render_many(renders, jobs=4)
+        self.assertLess(time.time() - started, 1.5)
+        self.assertEquals(fake_open_scad_runs(exe), 4)
+        for ((scene, output), result) in zip(renders, results):
+            self.assertTrue(result.ok)
+            self.assertEquals(result.output, output)
+            self.assertGreater(result.elapsed, 0.4)
+            with open(output) as fh:
+                self.assertEquals(fh.read(), scene.render_scad())
+
+    def test_failures_are_isolated(self):
+        exe = fake_open_scad_exe(self._tdir, 'case "$3" in *bad*) exit 3;; esac; cp "$1" "$3"')
+        scad = OpenSCAD(command=exe)
+        renders = [
+            (Cube(), self.tdir("good.stl")),
+            (Cube(), self.tdir("bad.stl")),
+            (Broken(), self.tdir("broken.stl")),
+            (Sphere(), self.tdir("sphere.png"), {"imgsize": (10, 10)}),
+        ]
+        results = scad.render_many(renders, jobs=2)
+        self.assertEquals([result.ok for result in results], [True, False, False, True])
+        self.assertEquals(results[1].returncode, 3)
+        self.assertTrue(isinstance(results[2].error, RuntimeError))
+        self.assertTrue(os.path.exists(self.tdir("sphere.png")))
+        self.assertFalse(os.path.exists(self.tdir("bad.stl")))
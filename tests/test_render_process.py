@@ -0,0 +1,86 @@
+from boiler import *
+import time
+
+class TestRenderProcess(unittest.TestCase):
+    def setUp(self):
+        self._tdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self._tdir)
+
+    def tdir(self, path):
+        return os.path.join(self._tdir, path)
+
+    def input_file(self, exe):
+        with open(exe + ".log") as fh:
+            return fh.readline().split()[0]
+
+    def test_background(self):
+        exe = fake_open_scad_exe(self._tdir, 'echo "a warning" >&2; cp "$1" "$3"')
+        process = OpenSCAD(command=exe).render(Cube(), self.tdir("cube.stl"), background=True)
+        result = process.wait()
+        self.assertTrue(process.done())
+        self.assertTrue(result.ok)
+        self.assertEquals(result.stderr.strip(), "a warning")
+        self.assertTrue(os.path.exists(self.tdir("cube.stl")))
+        self.assertFalse(os.path.exists(self.input_file(exe)))
+
+    def test_no_output(self):
+        # an empty scene, OpenSCAD succeeds without writing anything
+        exe = fake_open_scad_exe(self._tdir, 'echo "Current top level object is empty." >&2')
+        cache = RenderCache(self.tdir("cache"))
+        result = OpenSCAD(command=exe, cache=cache).render(Union(), self.tdir("empty.stl"))
+        self.assertTrue(result.ok)
+        self.assertEquals(result.error, None)
+        self.assertFalse(os.path.exists(self.tdir("empty.stl")))
+
+    def test_partial_output(self):
+        # the output of an earlier run is only replaced by a complete one
+        with open(self.tdir("cube.stl"), 'w') as fh:
+            fh.write("earlier")
+        exe = fake_open_scad_exe(self._tdir, 'echo "solid" > "$3"; exec sleep 10')
+        result = OpenSCAD(command=exe).render(Cube(), self.tdir("cube.stl"), timeout=0.5)
+        self.assertTrue(result.timed_out)
+        self.assertEquals(sorted(os.listdir(self._tdir)), ["cube.stl", "openscad", "openscad.log"])
+        with open(self.tdir("cube.stl")) as fh:
+            self.assertEquals(fh.read(), "earlier")
+        exe = fake_open_scad_exe(self._tdir, 'echo "solid" > "$3"')
+        self.assertTrue(OpenSCAD(command=exe).render(Cube(), self.tdir("cube.stl")).ok)
+        with open(self.tdir("cube.stl")) as fh:
+            self.assertEquals(fh.read(), "solid\n")
+        # OpenSCAD picks the format by the extension
+        with open(exe + ".log") as fh:
+            self.assertTrue(fh.readlines()[-1].split()[2].endswith(".stl"))
+
+    def test_timeout(self):
+        exe = fake_open_scad_exe(self._tdir, 'exec sleep 10')
+        result = OpenSCAD(command=exe).render(Cube(), self.tdir("cube.stl"), timeout=0.2)
+        self.assertTrue(result.timed_out)
+        self.assertFalse(result.ok)
+        self.assertLess(result.elapsed, 5)
+        self.assertFalse(os.path.exists(self.input_file(exe)))
+
+    def test_cancel(self):
+        exe = fake_open_scad_exe(self._tdir, 'exec sleep 10')
+        process = OpenSCAD(command=exe).render_async(Cube(), self.tdir("cube.stl"))
+        self.assertEquals(process.wait(0.2), None)
+        self.assertFalse(process.done())
+        self.assertTrue(process.cancel())
+        self.assertTrue(process.done())
+        self.assertTrue(process.result.cancelled)
+        self.assertFalse(process.result.ok)
+        self.assertFalse(process.cancel())
+        self.assertFalse(os.path.exists(self.input_file(exe)))
+
+    def test_scad_output(self):
+        process = OpenSCAD().render_async(Cube(), self.tdir("cube.scad"))
+        self.assertTrue(process.done())
+        self.assertTrue(process.wait().ok)
+
+    def test_command_line(self):
+        scad = OpenSCAD(input="in.scad", output="out file.stl", define={"width": 2, "label": "abc"})
+        args = scad.render_command_args()
+        self.assertEquals(args[1:4], ["in.scad", "-o", "out file.stl"])
+        self.assertIn("width=2", args)
+        self.assertIn('label="abc"', args)
+        self.assertIn("'out file.stl'", scad.render_command_line())
@@ -0,0 +1,106 @@
+from boiler import *
+import sys
+
+# renders translated cubes to STL, enough of OpenSCAD to test sharding
+FAKE_OPENSCAD = r"""
+import re, sys
+scad = open(sys.argv[1]).read()
+boxes = []
+for (offset, size) in re.findall(r"translate\(\[([^\]]*)\]\) \{\s*cube\(\[([^\]]*)\]", scad):
+    offset = [float(val) for val in offset.split(',')]
+    size = [float(val) for val in size.split(',')]
+    boxes.append((offset, [o + s for (o, s) in zip(offset, size)]))
+out = open(sys.argv[3], 'w')
+out.write("solid OpenSCAD_Model\n")
+for (lo, hi) in boxes:
+    corners = [(x, y, z) for x in (lo[0], hi[0]) for y in (lo[1], hi[1]) for z in (lo[2], hi[2])]
+    for tri in [(0, 1, 3), (0, 3, 2), (4, 6, 7), (4, 7, 5), (0, 4, 5), (0, 5, 1), (2, 3, 7), (2, 7, 6), (0, 2, 6), (0, 6, 4), (1, 5, 7), (1, 7, 3)]:
+        out.write("  facet normal 0 0 0\n    outer loop\n")
+        for idx in tri:
+            out.write("      vertex %s %s %s\n" % corners[idx])
+        out.write("    endloop\n  endfacet\n")
+out.write("endsolid OpenSCAD_Model\n")
+"""
+
+class TestRenderSharded(unittest.TestCase):
+    def setUp(self):
+        self._tdir = tempfile.mkdtemp()
+        script = self.tdir("fake_openscad.py")
+        with open(script, 'w') as fh:
+            fh.write(FAKE_OPENSCAD)
+        self.exe = fake_open_scad_exe(self._tdir, 'exec %s %s "$@"' % (sys.executable, script))
+        self.scad = OpenSCAD(command=self.exe)
+
+    def tearDown(self):
+        shutil.rmtree(self._tdir)
+
+    def tdir(self, path):
+        return os.path.join(self._tdir, path)
+
+    def plate(self, spacing):
+        return Union()(*[Translate(x=idx * spacing)(Cube(2)) for idx in range(4)])
+
+    def test_disjoint_parts(self):
+        result = self.scad.render_sharded(self.plate(3), self.tdir("plate.stl"), jobs=4)
+        self.assertTrue(result.ok)
+        self.assertEquals(len(result.shards), 4)
+        self.assertEquals(fake_open_scad_runs(self.exe), 4)
+        mesh = Mesh.read(self.tdir("plate.stl"))
+        self.assertEquals(len(mesh), 48)
+        self.assertEquals(mesh.bounds(), ((0.0, 0.0, 0.0), (11.0, 2.0, 2.0)))
+
+    def test_overlapping_parts(self):
+        result = self.scad.render_sharded(self.plate(1.5), self.tdir("plate.stl"), jobs=4)
+        self.assertTrue(result.ok)
+        # four shards plus the fallback render of the whole union
+        self.assertEquals(fake_open_scad_runs(self.exe), 5)
+        self.assertEquals(len(result.shards), 4)
+
+    def test_nested_unions(self):
+        scene = Union()(self.plate(3), Union()(Translate(y=5)(Cube(1))))
+        self.assertEquals(len(self.scad.shards(scene)), 5)
+        self.assertEquals(len(self.scad.shards(Union(debug=True)(Cube(), Cube()))), 1)
+
+    def test_modifiers(self):
+        plate = self.plate(3)
+        scene = Union()(plate, Translate(x=1, disable=True)(Cube()), Translate(x=1, background=True)(Cube()))
+        self.assertEquals(self.scad.shards(scene), list(plate.children))
+        self.assertEquals(len(self.scad.shards(Union()(plate, Translate(x=1, root=True)(Cube())))), 1)
+        result = self.scad.render_sharded(scene, self.tdir("plate.stl"), jobs=4)
+        self.assertTrue(result.ok)
+        self.assertEquals(len(result.shards), 4)
+
+    def test_failed_shard(self):
+        # parts without a cube fail, the scene as a whole renders
+        script = self.tdir("fake_openscad.py")
+        exe = fake_open_scad_exe(self._tdir, 'grep -q cube "$1" || exit 1\nexec %s %s "$@"' % (sys.executable, script))
+        scene = Union()(self.plate(3), Translate(x=20)(Sphere()))
+        result = OpenSCAD(command=exe).render_sharded(scene, self.tdir("plate.stl"), jobs=4)
+        self.assertTrue(result.ok)
+        self.assertEquals(len(result.shards), 5)
+        self.assertEquals(len([shard for shard in result.shards if not shard.ok]), 1)
+        self.assertEquals(fake_open_scad_runs(exe), 6)
+        self.assertEquals(len(Mesh.read(self.tdir("plate.stl"))), 48)
+
+    def test_single_part(self):
+        result = self.scad.render_sharded(Translate(x=1)(Cube(2)), self.tdir("part.stl"))
+        self.assertTrue(result.ok)
+        self.assertEquals(result.shards, None)
+        self.assertEquals(len(Mesh.read(self.tdir("part.stl"))), 12)
+
+    def test_overlapping(self):
+        box = lambda x: ((x, 0, 0), (x + 1, 1, 1))
+        self.assertEquals(Mesh.overlapping([box(0), box(2), box(4)]), None)
+        self.assertEquals(Mesh.overlapping([box(0), box(4), box(1)]), (0, 2))
+        self.assertEquals(Mesh.overlapping([box(0), None, box(0.5)]), (0, 2))
+
+    def test_binary_stl(self):
+        import struct
+        fn = self.tdir("binary.stl")
+        with open(fn, 'wb') as fh:
+            fh.write("solid binary".ljust(80))
+            fh.write(struct.pack("<I", 1))
+            fh.write(struct.pack("<12fH", 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0))
+        mesh = Mesh.read(fn)
+        self.assertEquals(len(mesh), 1)
+        self.assertEquals(mesh.bounds(), ((0.0, 0.0, 0.0), (1.0, 1.0, 0.0)))
@@ -0,0 +1,60 @@
+from boiler import *
+import json
+
+CGAL_OUTPUT = """\
+Compiling design (CSG Tree generation)...
+Rendering Polygon Mesh using CGAL...
+Geometries in cache: 4
+Geometry cache size in bytes: 2856
+CGAL Polyhedrons in cache: 2
+CGAL cache size in bytes: 451384
+Total rendering time: 0 hours, 1 minutes, 3 seconds
+Top level object is a 3D object:
+   Simple:        yes
+   Vertices:       26
+   Halfedges:     120
+   Edges:          60
+   Halffacets:    72
+   Facets:         36
+   Volumes:         2
+WARNING: Object may not be a valid 2-manifold and may need repair!
+Rendering finished.
+"""
+
+class TestRenderStats(unittest.TestCase):
+    def test_parse(self):
+        stats = RenderStats.parse(CGAL_OUTPUT, 64.5)
+        self.assertEquals(stats.wall_time, 64.5)
+        self.assertEquals(stats.cgal_time, 63.0)
+        self.assertEquals(stats.dimensions, 3)
+        self.assertEquals(stats.simple, True)
+        self.assertEquals(stats.vertices, 26)
+        self.assertEquals(stats.facets, 36)
+        self.assertEquals(stats.volumes, 2)
+        self.assertEquals(stats.geometry_cache_entries, 4)
+        self.assertEquals(stats.cgal_cache_bytes, 451384)
+        self.assertEquals(stats.warnings, ["Object may not be a valid 2-manifold and may need repair!"])
+        self.assertEquals(stats.errors, [])
+
+    def test_parse_new_time_format(self):
+        stats = RenderStats.parse("Total rendering time: 0:02:01.250\nERROR: Parser error")
+        self.assertEquals(stats.cgal_time, 121.25)
+        self.assertEquals(stats.errors, ["Parser error"])
+        self.assertEquals(stats.facets, None)
+
+    def test_render_stats(self):
+        tdir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(tdir, "stderr.txt"), 'w') as fh:
+                fh.write(CGAL_OUTPUT)
+            exe = fake_open_scad_exe(tdir, 'cat "$(dirname "$0")/stderr.txt" >&2; cp "$1" "$3"')
+            output = os.path.join(tdir, "part.stl")
+            result = OpenSCAD(command=exe).render(Cube(), output, stats=True)
+            self.assertEquals(result.stats.facets, 36)
+            self.assertEquals(result.stats.wall_time, result.elapsed)
+            with open(output + ".stats.json") as fh:
+                saved = json.load(fh)
+            self.assertEquals(saved["volumes"], 2)
+            self.assertEquals(saved["cgal_time"], 63.0)
+        finally:
+            shutil.rmtree(tdir)
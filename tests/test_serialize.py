@@ -0,0 +1,124 @@
+from boiler import *
+import pickle
+import cPickle
+import json
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def scene():
+    corner = Cylinder(r=1, h=2, fn=20, name="corner")
+    return Union(name="scene")(
+        Translate(x=1)(corner),
+        Translate(x=-1)(corner),
+        Pipe(or1=8, ir1=7, h=20.0, center=True),
+        Polyhedron(points=[[0, 0, 0], [1, 0, 0], [0, 1, 0]], faces=[[0, 1, 2]]),
+        Color("red")(Cube((1, 2, 3))),
+    )
+
+class TestSerialize(unittest.TestCase):
+    def check_copy(self, original, copied):
+        self.assertEquals(original.render_scad(), copied.render_scad())
+        self.assertEquals(original.fingerprint(), copied.fingerprint())
+        self.assertEquals(original.name, copied.name)
+
+    def test_pickle(self):
+        for module in (pickle, cPickle):
+            for protocol in (0, 2):
+                original = scene()
+                copied = module.loads(module.dumps(original, protocol))
+                self.check_copy(original, copied)
+                # shared subtrees stay shared
+                self.assertTrue(copied.children[0].children[0] is copied.children[1].children[0])
+
+    def test_pickle_pushed(self):
+        c = Cube((1, 2, 3))
+        c.push()
+        copied = pickle.loads(pickle.dumps(c, 2))
+        copied.x = 5
+        copied.pop()
+        self.assertEquals(copied.x, 1)
+
+    def test_copy(self):
+        original = scene()
+        copied = original.copy()
+        self.check_copy(original, copied)
+        self.assertFalse(copied.children[0] is original.children[0])
+        # shared subtrees stay shared
+        self.assertTrue(copied.children[0].children[0] is copied.children[1].children[0])
+        pipe = copied.children[2]
+        self.assertFalse(pipe.inner is original.children[2].inner)
+        pipe.inner.radius = 2
+        self.assertEquals(original.children[2].inner.radius, 7)
+        self.assertEquals(original.copy(descend=False).children, ())
+
+    def test_copy_pushed(self):
+        c = Cylinder(r=1, h=2, fn=10)
+        c.push()
+        c.r = 3
+        c.push()
+        d = c.copy()
+        d.pop()
+        d.h = 9
+        d.resolution.fn = 99
+        self.assertEquals((c.r, c.h, c.resolution.fn), (3, 2, 10))
+        d.pop()
+        self.assertEquals((d.r, d.h), (1, 2))
+        c.r = 5
+        c.pop()
+        self.assertEquals(c.r, 3)
+        c.pop()
+        self.assertEquals((c.r, c.h, c.resolution.fn), (1, 2, 10))
+        self.assertEquals(d.resolution.fn, 99)
+        self.assertEquals(c.copy(stack=False).stack, ())
+
+    def test_json(self):
+        original = scene()
+        text = dumps_scene(original)
+        copied = loads_scene(text)
+        self.check_copy(original, copied)
+        self.assertTrue(copied.children[0].children[0] is copied.children[1].children[0])
+        # the shared cylinder is stored once
+        self.assertEquals(text.count('"name":"corner"'), 1)
+        self.assertTrue(isinstance(copied.children[3].points, ListVector3D))
+
+    def test_json_unknown_values(self):
+        # values that aren't part of the format can't be saved
+        c = Cube()
+        c["extra"] = object()
+        self.assertRaises(TypeError, dumps_scene, c)
+        c["extra"] = set([1])
+        self.assertRaises(TypeError, dumps_scene, c)
+
+    def test_json_only_loads_scene_classes(self):
+        text = dumps_scene(Translate(x=1)(Cube()))
+        content = json.loads(text)
+        content["nodes"][1]["class"] = "os.system"
+        self.assertRaises(ValueError, loads_scene, json.dumps(content))
+        content["nodes"][1]["class"] = "scad.vector.Vector3D"
+        loads_scene(json.dumps(content))
+        # no pickles and no arbitrary callables
+        for value in ({"$pickle": "Y29zCnN5c3RlbQou"}, {"$seq": "__builtin__.eval", "items": ["1"]}, \
+                {"$seq": "scad.core.OpenSCAD", "items": []}):
+            content["nodes"][0]["ns"]["vector"] = value
+            self.assertRaises(ValueError, loads_scene, json.dumps(content))
+
+    def test_json_file(self):
+        tdir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tdir, "scene.json")
+            original = scene()
+            dump_scene(original, fn)
+            self.check_copy(original, load_scene(fn))
+        finally:
+            shutil.rmtree(tdir)
+
+    @unittest.skipUnless(numpy, "numpy is not available")
+    def test_json_arrays(self):
+        points = numpy.arange(30, dtype=float).reshape(-1, 3)
+        original = Polyhedron(points=points, faces=numpy.arange(30).reshape(-1, 3))
+        copied = loads_scene(dumps_scene(original))
+        self.assertTrue((copied.points == points).all())
+        self.check_copy(original, copied)
@@ -0,0 +1,117 @@
+from boiler import *
+from scad.transform import determinant
+
+def apply(matrix, point):
+    return tuple([sum([(m * v) for (m, v) in zip(row, list(point) + [1.0])]) for row in matrix[:3]])
+
+class TestTransformFolding(unittest.TestCase):
+    def test_multmatrix(self):
+        m = Multmatrix([[1, 0, 0, 2], [0, 1, 0, 0], [0, 0, 1, 0]])(Cube())
+        self.assertEquals(m.matrix[3], (0.0, 0.0, 0.0, 1.0))
+        answer = "multmatrix(m=[[1.0,0.0,0.0,2.0],[0.0,1.0,0.0,0.0],[0.0,0.0,1.0,0.0],[0.0,0.0,0.0,1.0]]){cube([1.0,1.0,1.0],center=false);}"
+        code_compare(m.render_scad(), answer)
+        self.assertRaises(ValueError, Multmatrix, [[1, 0, 0], [0, 1, 0]])
+
+    def test_rotation_order(self):
+        # x first, then y, then z
+        self.assertEquals(apply(rotation_matrix((90, 90, 0)), (0, 1, 0)), (1.0, 0.0, 0.0))
+        self.assertEquals(rotation_matrix(90, (0, 0, 2)), rotation_matrix((0, 0, 90)))
+        self.assertEquals(rotation_matrix(90), rotation_matrix((0, 0, 90)))
+        for (angle, axis) in ((30, (1, 2, 3)), (-45, (0, 1, 0))):
+            matrix = rotation_matrix(angle, axis)
+            self.assertAlmostEqual(determinant(matrix), 1.0)
+            # the axis stays put
+            for (lhs, rhs) in zip(apply(matrix, axis), axis):
+                self.assertAlmostEqual(lhs, rhs)
+
+    def test_fold_chain(self):
+        scene = Translate(x=10)(Rotate(z=90)(Translate(y=5)(Scale((2, 2, 2))(Cube()))))
+        folder = TransformFolder(scene)
+        ret = folder.fold()
+        self.assertEquals(folder.removed, 3)
+        self.assertEquals(ret.SCAD_Name, "multmatrix")
+        self.assertEquals(ret.children[0].SCAD_Name, "cube")
+        self.assertEquals(apply(ret.matrix, (1, 0, 0)), (5.0, 2.0, 0.0))
+        self.assertEquals(ret.render_scad().count("multmatrix"), 1)
+        # the scene is left alone
+        self.assertEquals(scene.children[0].SCAD_Name, "rotate")
+
+    def test_fold_stops(self):
+        # at modifiers and at transforms of several children
+        scene = Translate(x=1)(Rotate(z=90, debug=True)(Translate(y=1)(Cube())))
+        self.assertTrue(TransformFolder(scene).fold() is scene)
+        scene = Union()(Translate(x=1)(Translate(y=1)(Cube(), Sphere())), Translate(x=1)(Cube()))
+        folder = TransformFolder(scene)
+        ret = folder.fold()
+        self.assertEquals(folder.removed, 0)
+        self.assertTrue(ret is scene)
+
+    def test_fold_nested(self):
+        post = Translate(z=1)(Scale((1, 1, 2))(Cylinder()))
+        scene = Union()(Translate(x=1)(Rotate(z=45)(Difference()(post, Translate(z=2)(Rotate(x=1)(Cube()))))), post)
+        folder = TransformFolder(scene)
+        ret = folder.fold()
+        self.assertEquals(folder.removed, 3)
+        # the post is emitted twice
+        self.assertEquals(ret.render_scad().count("multmatrix"), 4)
+        diff = ret.children[0].children[0]
+        # shared subtrees stay shared
+        self.assertTrue(diff.children[0] is ret.children[1])
+
+    def test_openscad_fold_option(self):
+        tdir = tempfile.mkdtemp()
+        try:
+            fn = os.path.join(tdir, "scene.scad")
+            post = Translate(x=10)(Rotate(z=90)(Translate(y=5)(Cube())))
+            scene = Union()(post, Translate(x=-10)(Scale((1, 1, 2))(Sphere())))
+            OpenSCAD().render(scene, fn, fold=True)
+            with open(fn) as fh:
+                scad = fh.read()
+            self.assertEquals(scad, TransformFolder(scene).fold().render_scad())
+            self.assertEquals(scad.count("multmatrix"), 2)
+            self.assertEquals(scad.count("translate"), 0)
+            # together with the optimizer and modules
+            OpenSCAD().render(Union()(Union()(post), Translate()(post)), fn, fold=True, optimize=True, modules=True)
+            with open(fn) as fh:
+                scad = fh.read()
+            # the folded post is emitted once, as a module
+            self.assertEquals(scad.count("multmatrix"), 1)
+            self.assertEquals(scad.count("module m_"), 1)
+            OpenSCAD().render(scene, fn)
+            with open(fn) as fh:
+                self.assertEquals(fh.read(), scene.render_scad())
+        finally:
+            shutil.rmtree(tdir)
+
+    def test_bake_polyhedron(self):
+        points = [[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]]
+        faces = [[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]]
+        scene = Translate(x=1)(Rotate(z=90)(Polyhedron(points=points, faces=faces)))
+        folder = TransformFolder(scene, bake=True)
+        ret = folder.fold()
+        self.assertEquals(folder.removed, 2)
+        self.assertEquals(ret.SCAD_Name, "polyhedron")
+        self.assertEquals([list(point) for point in ret.points][1], [1.0, 1.0, 0.0])
+        self.assertEquals([list(face) for face in ret.faces], [list(face) for face in scene.children[0].children[0].faces])
+        # without bake, the points are kept
+        self.assertEquals(TransformFolder(scene).fold().SCAD_Name, "multmatrix")
+
+    def test_bake_mirrored(self):
+        points = [[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]]
+        faces = [[0, 1, 2], [0, 1, 3], [0, 2, 3], [1, 2, 3]]
+        scene = Scale((-1, 1, 1))(Polyhedron(points=points, faces=faces))
+        ret = TransformFolder(scene, bake=True).fold()
+        self.assertEquals([list(point) for point in ret.points][1], [-1.0, 0.0, 0.0])
+        self.assertEquals([list(face) for face in ret.faces][0], [2.0, 1.0, 0.0])
+
+    def test_bake_polygon(self):
+        polygon = Polygon(points=[[1, 0], [0, 1], [0, 0]])
+        ret = TransformFolder(Rotate(z=90)(polygon), bake=True).fold()
+        self.assertEquals([list(point) for point in ret.points], [[0.0, 1.0], [-1.0, 0.0], [0.0, 0.0]])
+        # leaves the xy plane, can't be baked
+        ret = TransformFolder(Rotate(x=90)(polygon), bake=True).fold()
+        self.assertEquals(ret.SCAD_Name, "rotate")
+
+    def test_optimizer_drops_identity_multmatrix(self):
+        scene = Union()(Multmatrix()(Cube()), Sphere())
+        self.assertEquals(CSGOptimizer(scene).optimize().render_scad().count("multmatrix"), 0)
@@ -1,6 +1,7 @@
 import unittest
 import tempfile
 import shutil
+import os
 from scad import *
 from scad.base import BaseObject
 
@@ -21,3 +22,17 @@ def code_compare(result, expected):
 def open_scad_exe():
     scad = OpenSCAD()
     return scad.command
+
+def fake_open_scad_exe(dirname, body='cp "$1" "$3"'):
+    # a stand-in for OpenSCAD that logs its arguments and copies the input to the output
+    path = os.path.join(dirname, "openscad")
+    with open(path, 'w') as fh:
+        fh.write('#!/bin/sh\necho "$@" >> "$0.log"\n%s\n' % body)
+    os.chmod(path, 0755)
+    return path
+
+def fake_open_scad_runs(path):
+    if not os.path.exists(path + ".log"):
+        return 0
+    with open(path + ".log") as fh:
+        return len(fh.readlines())